@@ -1,18 +1,22 @@
 import streamlit as st
-import pandas as pd
-import altair as alt
 import calendar
+import functools
 import os
-import json
+import sqlite3
 from datetime import datetime, timedelta
-import plotly.express as px
-import plotly.graph_objects as go
-from PIL import Image
-import base64
-from io import BytesIO
 import uuid
-from google.ads.googleads.client import GoogleAdsClient
-from google.ads.googleads.errors import GoogleAdsException
+# pandas, plotly and the Google Ads library are imported where they are first used to keep cold starts fast,
+# scripts/startup_benchmark.py checks the remaining top-level imports against a time budget
+from shared_cache import SharedResultCache, make_cache_key
+from snapshot_store import SnapshotStore
+from period_calendar import GRANULARITIES, MONTHS, add_months, period_table
+from result_export import (
+    available_compressions, available_formats, export_file_name, export_mime_type, read_export
+)
+from project_files import (
+    DEFAULT_BRAND_COLORS, brands_to_rows, diff_projects, export_project,
+    parse_project, rows_to_brands, split_keywords, yaml_available
+)
 
 # Set page configuration
 st.set_page_config(
@@ -25,6 +29,8 @@ st.set_page_config(
 @st.cache_resource
 def get_google_ads_client():
     """Create and return a Google Ads API client using credentials from Streamlit secrets."""
+    from google.ads.googleads.client import GoogleAdsClient
+    
     try:
         # Load credentials from Streamlit secrets
         credentials = {
@@ -287,56 +293,120 @@ COUNTRY_MAPPING = {
     "Zimbabwe": "2716"
 }
 
+# Process-wide cache shared by every session of this Streamlit server
+@st.cache_resource
+def get_shared_cache():
+    """Create the shared result cache, backed by SQLite when RESULT_CACHE_PATH is set in secrets."""
+    return SharedResultCache(
+        max_entries=int(st.secrets.get("RESULT_CACHE_MAX_ENTRIES", 512)),
+        ttl_seconds=int(st.secrets.get("RESULT_CACHE_TTL_SECONDS", 12 * 60 * 60)),
+        db_path=st.secrets.get("RESULT_CACHE_PATH")
+    )
+
+# History of fetched volumes, shared by every session of this Streamlit server
+@st.cache_resource
+def get_snapshot_store():
+    """Open the snapshot store at SNAPSHOT_STORE_PATH from secrets, or snapshot_history.sqlite by default."""
+    return SnapshotStore(st.secrets.get("SNAPSHOT_STORE_PATH", "snapshot_history.sqlite"))
+
+# Function to request keyword ideas for one set of seed keywords
+def fetch_keyword_ideas(client, customer_id, keywords, settings):
+    """Call GenerateKeywordIdeas and return the ideas as plain dicts that can be cached and shared."""
+    start_date = datetime.strptime(settings["dateFrom"], "%Y-%m")
+    end_date = datetime.strptime(settings["dateTo"], "%Y-%m")
+    location_id = COUNTRY_MAPPING.get(settings["location"], "2840")  # Default to US if not found
+
+    # Create keyword plan idea service
+    keyword_plan_idea_service = client.get_service("KeywordPlanIdeaService")
+    googleads_service = client.get_service("GoogleAdsService")
+
+    # Create request for keyword ideas
+    request = client.get_type("GenerateKeywordIdeasRequest")
+    request.customer_id = customer_id
+
+    # Set up keyword seed
+    request.keyword_seed.keywords.extend(keywords)
+
+    # Add geo target constants if not "All Countries"
+    if settings["location"] != "All Countries":
+        request.geo_target_constants.append(googleads_service.geo_target_constant_path(location_id))
+
+    # Set network based on settings
+    if settings["network"] == "GOOGLE_SEARCH":
+        request.keyword_plan_network = client.enums.KeywordPlanNetworkEnum.GOOGLE_SEARCH
+    else:  # GOOGLE_SEARCH_AND_PARTNERS
+        request.keyword_plan_network = client.enums.KeywordPlanNetworkEnum.GOOGLE_SEARCH_AND_PARTNERS
+
+    historical_metrics_options = request.historical_metrics_options
+    year_month_range = historical_metrics_options.year_month_range
+
+    year_month_range.start.year = start_date.year
+    month_enum_name = calendar.month_name[start_date.month].upper()
+    year_month_range.start.month = client.enums.MonthOfYearEnum[month_enum_name]
+
+    # End date +1 logic
+    end_year, end_month = add_months(end_date.year, end_date.month, 1)
+    end_month_enum_name = calendar.month_name[end_month].upper()
+    year_month_range.end.year = end_year
+    year_month_range.end.month = client.enums.MonthOfYearEnum[end_month_enum_name]
+
+    # Execute the request
+    response = keyword_plan_idea_service.generate_keyword_ideas(request=request)
+
+    ideas = []
+    for result in response:
+        keyword_metrics = result.keyword_idea_metrics
+        ideas.append({
+            "text": result.text,
+            "avg_monthly_searches": keyword_metrics.avg_monthly_searches,
+            # MonthOfYearEnum values are offset by one (JANUARY == 2), store 1-based months
+            "monthly_search_volumes": [
+                [monthly_search_volume.year, monthly_search_volume.month.value - 1, monthly_search_volume.monthly_searches]
+                for monthly_search_volume in keyword_metrics.monthly_search_volumes
+            ]
+        })
+
+    return {"fetched_at": datetime.now().isoformat(timespec="seconds"), "ideas": ideas}
+
 # Function to get search volumes from Google Ads API using GenerateKeywordIdeas
-def get_search_volumes(brands, settings, client):
-    """Retrieve search volume data from Google Ads API for specified brands and keywords using Keyword Ideas API."""
+def get_search_volumes(brands, settings, client, collected_ideas=None):
+    """Retrieve search volume data from Google Ads API for specified brands and keywords using Keyword Ideas API.
+
+    When collected_ideas is a list, the ideas that match none of a brand's keywords are appended
+    to it, tagged with the brand they were returned for, so discovery mode can reuse them.
+    """
     if not client:
         st.error("Google Ads client not initialized. Please check your credentials.")
         return []
     
-    results = []
+    import pandas as pd
+    from google.ads.googleads.errors import GoogleAdsException
     
-    # Parse date range from settings
-    start_date = datetime.strptime(settings["dateFrom"], "%Y-%m")
-    end_date = datetime.strptime(settings["dateTo"], "%Y-%m")
+    # Month -> period mapping for the selected range, clipped to the selected months
+    periods = period_table(
+        settings["dateFrom"], settings["dateTo"], settings["granularity"], settings.get("fiscalStartMonth", 1)
+    )
     
-    # Generate time periods based on granularity
-    periods = []
-    current_date = start_date
-    
-    if settings["granularity"] == "monthly":
-        while current_date <= end_date:
-            periods.append((current_date.year, current_date.month, current_date.strftime("%Y-%m")))
-            # Add one month
-            month = current_date.month + 1
-            year = current_date.year
-            if month > 12:
-                month = 1
-                year += 1
-            current_date = current_date.replace(year=year, month=month, day=1)
-    elif settings["granularity"] == "quarterly":
-        while current_date <= end_date:
-            quarter = (current_date.month - 1) // 3 + 1
-            # Include incomplete quarters
-            periods.append((current_date.year, quarter, f"{current_date.year}-Q{quarter}"))
-            # Add one quarter (3 months)
-            month = current_date.month + 3
-            year = current_date.year
-            if month > 12:
-                month = month - 12
-                year += 1
-            current_date = current_date.replace(year=year, month=month, day=1)
-    else:  # yearly
-        while current_date.year <= end_date.year:
-            # Include incomplete years
-            periods.append((current_date.year, None, str(current_date.year)))
-            current_date = current_date.replace(year=current_date.year + 1, month=1, day=1)
+    # Monthly volumes of the keywords that belong to each brand, as (brand, year, month, searches) rows
+    monthly_rows = []
     
     # Get location ID
     location_id = COUNTRY_MAPPING.get(settings["location"], "2840")  # Default to US if not found
     
     # Get customer ID from secrets
     customer_id = st.secrets["GOOGLE_CUSTOMER_ID"]
+    shared_cache = get_shared_cache()
+    
+    def fetch_and_record(brand_name, brand_keywords):
+        response = fetch_keyword_ideas(client, customer_id, brand_keywords, settings)
+        # Keep the fetched values so later revisions by Google can be compared, cached responses are already kept
+        try:
+            get_snapshot_store().record(
+                customer_id, location_id, settings["network"], response["fetched_at"], response["ideas"]
+            )
+        except sqlite3.Error as e:
+            st.warning(f"Could not save the snapshot for {brand_name}: {str(e)}")
+        return response
     
     # Process each brand and its keywords
     for brand in brands:
@@ -344,93 +414,30 @@ def get_search_volumes(brands, settings, client):
             continue
         
         brand_keywords = [k.strip() for k in brand["keywords"] if k.strip()]
+        brand_keywords_lower = {k.lower() for k in brand_keywords}
         
         try:
-            # Create keyword plan idea service
-            keyword_plan_idea_service = client.get_service("KeywordPlanIdeaService")
-            googleads_service = client.get_service("GoogleAdsService")
-            
-            # Create request for keyword ideas
-            request = client.get_type("GenerateKeywordIdeasRequest")
-            request.customer_id = customer_id
-            
-            # Set up keyword seed
-            request.keyword_seed.keywords.extend(brand_keywords)
-            
-            # Add geo target constants if not "All Countries"
-            if settings["location"] != "All Countries":
-                request.geo_target_constants.append(googleads_service.geo_target_constant_path(location_id))
-            
-            # Set network based on settings
-            if settings["network"] == "GOOGLE_SEARCH":
-                request.keyword_plan_network = client.enums.KeywordPlanNetworkEnum.GOOGLE_SEARCH
-            else:  # GOOGLE_SEARCH_AND_PARTNERS
-                request.keyword_plan_network = client.enums.KeywordPlanNetworkEnum.GOOGLE_SEARCH_AND_PARTNERS
-
-            historical_metrics_options = request.historical_metrics_options
-            year_month_range = historical_metrics_options.year_month_range
-
-            historical_metrics_options = request.historical_metrics_options
-            year_month_range = historical_metrics_options.year_month_range
-
-            year_month_range.start.year = start_date.year
-            month_enum_name = calendar.month_name[start_date.month].upper()
-            year_month_range.start.month = client.enums.MonthOfYearEnum[month_enum_name]
-
-            # End date +1 logic
-            end_month = end_date.month + 1
-            end_year = end_date.year
-            if end_month > 12:
-                end_month = 1
-                end_year += 1
-            end_month_enum_name = calendar.month_name[end_month].upper()
-            year_month_range.end.year = end_year
-            year_month_range.end.month = client.enums.MonthOfYearEnum[end_month_enum_name]
-            
-            # Execute the request
-            response = keyword_plan_idea_service.generate_keyword_ideas(request=request)
-            
-            # Process the response for each period
-            for period_year, period_month_or_quarter, period_label in periods:
-                brand_volume = 0
-                
-                # Process each result
-                for result in response:
-                    if result.text.lower() in [k.lower() for k in brand_keywords]:
-                        keyword_metrics = result.keyword_idea_metrics
-                        
-                        if settings["granularity"] == "monthly" and period_month_or_quarter is not None:
-                            for monthly_search_volume in keyword_metrics.monthly_search_volumes:
-                                # ✨ Fix: Align using 1-based period_month_or_quarter
-                                if (monthly_search_volume.year == period_year and 
-                                    monthly_search_volume.month.value - 1 == period_month_or_quarter):
-                                    brand_volume += monthly_search_volume.monthly_searches
-                        
-                        elif settings["granularity"] == "quarterly" and period_month_or_quarter is not None:
-                            quarter_start_month = (period_month_or_quarter - 1) * 3 + 1
-                            quarter_end_month = min(quarter_start_month + 2, end_date.month) if period_year == end_date.year else quarter_start_month + 2
-                            for monthly_search_volume in keyword_metrics.monthly_search_volumes:
-                                # ✨ Fix: Compare directly with value (1-based)
-                                if (monthly_search_volume.year == period_year and 
-                                    quarter_start_month <= monthly_search_volume.month.value - 1 <= quarter_end_month):
-                                    brand_volume += monthly_search_volume.monthly_searches
-                        
-                        elif settings["granularity"] == "yearly":
-                            for monthly_search_volume in keyword_metrics.monthly_search_volumes:
-                                if monthly_search_volume.year == period_year:
-                                    # For the end year, only include months up to the selected end month
-                                    if period_year == end_date.year and monthly_search_volume.month.value - 1 > end_date.month:
-                                        continue
-                                    brand_volume += monthly_search_volume.monthly_searches
-                
-                if brand_volume > 0:
-                    results.append({
-                        "brand": brand["name"],
-                        "period": period_label,
-                        "volume": brand_volume,
-                        "share": 0,
-                        "color": brand["color"]
-                    })
+            # Identical requests from any session are fetched once and shared
+            cache_key = make_cache_key({
+                "keywords": sorted(brand_keywords_lower),
+                "location": location_id,
+                "network": settings["network"],
+                "dateFrom": settings["dateFrom"],
+                "dateTo": settings["dateTo"]
+            })
+            response = shared_cache.get_or_fetch(
+                customer_id,
+                cache_key,
+                lambda: fetch_and_record(brand["name"], brand_keywords)
+            )
+            
+            # Keep only the ideas that match the brand's own keywords, the rest feed discovery mode
+            for idea in response["ideas"]:
+                if idea["text"].lower() in brand_keywords_lower:
+                    for year, month, searches in idea["monthly_search_volumes"]:
+                        monthly_rows.append((brand["name"], year, month, searches or 0))
+                elif collected_ideas is not None:
+                    collected_ideas.append({**idea, "source_brand": brand["name"]})
         
         except GoogleAdsException as ex:
             st.error(f"Google Ads API error for brand {brand['name']}: {ex}")
@@ -442,21 +449,191 @@ def get_search_volumes(brands, settings, client):
             st.error(f"Error retrieving search volume for {brand['name']}: {str(e)}")
             continue
     
-    # Calculate total volume and share percentages for each period
-    period_totals = {}
-    for result in results:
-        period = result["period"]
-        if period not in period_totals:
-            period_totals[period] = 0
-        period_totals[period] += result["volume"]
+    if not monthly_rows:
+        return []
+    
+    # Aggregate months into periods with a single join against the period table
+    volumes = pd.DataFrame(monthly_rows, columns=["brand", "year", "month", "volume"])
+    volumes = volumes.merge(periods, on=["year", "month"], how="inner")
+    volumes = (
+        volumes.groupby(["brand", "period", "period_start", "period_end"], as_index=False, sort=False)["volume"].sum()
+    )
+    volumes = volumes[volumes["volume"] > 0]
+    
+    # Calculate share percentages for each period
+    period_totals = volumes.groupby("period")["volume"].transform("sum")
+    volumes["share"] = (volumes["volume"] / period_totals * 100).round(1)
+    
+    # Order rows by brand as entered, then chronologically
+    brand_order = {name: i for i, name in enumerate(dict.fromkeys(brand["name"] for brand in brands))}
+    volumes["color"] = volumes["brand"].map({brand["name"]: brand["color"] for brand in brands})
+    volumes = volumes.assign(brand_order=volumes["brand"].map(brand_order)).sort_values(["brand_order", "period_start"])
     
-    for result in results:
-        period = result["period"]
-        if period_totals[period] > 0:
-            result["share"] = round((result["volume"] / period_totals[period]) * 100, 1)
+    results = volumes[["brand", "period", "volume", "share", "color", "period_start", "period_end"]].to_dict("records")
     
     return results
 
+# Widget keys whose stored values would override a loaded configuration
+SETTINGS_WIDGET_KEYS = ["from_year", "from_month", "to_year", "to_month"]
+BRAND_WIDGET_PREFIXES = ("own_name_", "own_color_", "own_keywords_", "comp_name_", "comp_color_", "comp_keywords_")
+
+def reset_editor_widgets():
+    """Forget brand and date widget state so widgets pick up the brands and settings in session state."""
+    for key in list(st.session_state.keys()):
+        if key in SETTINGS_WIDGET_KEYS or key.startswith(BRAND_WIDGET_PREFIXES):
+            del st.session_state[key]
+
+# Callback for the project file uploader, runs before the rerun so loading costs a single rerun
+def load_project_file():
+    """Replace brands and settings with the contents of the uploaded project file."""
+    uploaded = st.session_state.get("project_upload")
+    if uploaded is None:
+        return
+    fmt = "yaml" if uploaded.name.lower().endswith((".yaml", ".yml")) else "json"
+    try:
+        brands, settings = parse_project(uploaded.getvalue().decode("utf-8"), fmt)
+    except (ValueError, UnicodeDecodeError) as e:
+        st.session_state["project_message"] = ("error", f"Could not load {uploaded.name}: {e}")
+        return
+    st.session_state["brands"] = brands or [
+        {"id": str(uuid.uuid4()), "name": "", "keywords": [""], "isOwnBrand": True, "color": DEFAULT_BRAND_COLORS[0]}
+    ]
+    st.session_state["settings"].update(settings)
+    reset_editor_widgets()
+    st.session_state["project_message"] = ("success", f"Loaded {len(brands)} brands from {uploaded.name}")
+
+# Callback for the bulk editor form, applies the table edits to the brand list in one step
+def apply_bulk_edits():
+    """Merge the edits recorded by the bulk brand table into session state."""
+    changes = st.session_state.get("bulk_editor") or {}
+    rows = brands_to_rows(st.session_state["brands"])
+    for index, edited in changes.get("edited_rows", {}).items():
+        rows[int(index)].update(edited)
+    deleted = {int(index) for index in changes.get("deleted_rows", [])}
+    rows = [row for i, row in enumerate(rows) if i not in deleted]
+    rows.extend(changes.get("added_rows", []))
+    st.session_state["brands"] = rows_to_brands(rows)
+    del st.session_state["bulk_editor"]
+    reset_editor_widgets()
+
+# Number of brand editors shown per page of each brand list
+BRAND_PAGE_SIZE = 20
+
+# Index of brands by role, built once per rerun instead of re-filtering the list for every use
+def index_brands(brands):
+    """Group brands into own, competitor and valid (named, with keywords) lists in a single pass."""
+    index = {"own": [], "competitor": [], "valid": []}
+    for brand in brands:
+        index["own" if brand["isOwnBrand"] else "competitor"].append(brand)
+        if brand["name"] and any(k.strip() for k in brand["keywords"]):
+            index["valid"].append(brand)
+    return index
+
+# Function to add a new brand, used as a button callback so it runs before the rerun
+def add_brand(is_own_brand):
+    """Append an empty brand of the given role and jump to the page that shows it."""
+    role = "own" if is_own_brand else "competitor"
+    brand_count = len(index_brands(st.session_state["brands"])[role])
+    st.session_state["brands"].append({
+        "id": str(uuid.uuid4()),
+        "name": "",
+        "keywords": [""],
+        "isOwnBrand": is_own_brand,
+        "color": DEFAULT_BRAND_COLORS[brand_count % len(DEFAULT_BRAND_COLORS)]
+    })
+    st.session_state[f"{role}_brand_page"] = brand_count // BRAND_PAGE_SIZE + 1
+
+# Widget callback that copies an edited value into the brand it belongs to
+def update_brand_field(brand, field, widget_key):
+    """Store the widget value on the brand, splitting keyword text into a list."""
+    value = st.session_state[widget_key]
+    if field == "keywords":
+        value = split_keywords(value)
+    brand[field] = value
+
+# Each brand is its own fragment, so editing one brand only re-executes that brand's widgets
+@st.fragment
+def render_brand_editor(brand, label, key_prefix):
+    """Render the expander with name, color and keyword inputs for one brand."""
+    name_key = f"{key_prefix}_name_{brand['id']}"
+    color_key = f"{key_prefix}_color_{brand['id']}"
+    keywords_key = f"{key_prefix}_keywords_{brand['id']}"
+    
+    # Seed widget state once, later reruns read it back without re-joining keywords
+    if name_key not in st.session_state:
+        st.session_state[name_key] = brand["name"]
+    if color_key not in st.session_state:
+        st.session_state[color_key] = brand["color"]
+    if keywords_key not in st.session_state:
+        st.session_state[keywords_key] = "\n".join(brand["keywords"])
+    
+    with st.expander(f"{label}: {brand['name'] or 'Unnamed'}", expanded=brand["name"] == ""):
+        # Brand name
+        st.text_input("Brand Name", key=name_key, on_change=update_brand_field, args=(brand, "name", name_key))
+        
+        # Brand color
+        st.color_picker("Brand Color", key=color_key, on_change=update_brand_field, args=(brand, "color", color_key))
+        
+        # Keywords
+        st.write("Keywords (one per line):")
+        st.text_area("Keywords", key=keywords_key, label_visibility="collapsed",
+                     on_change=update_brand_field, args=(brand, "keywords", keywords_key))
+        
+        # Remove brand button, reruns the whole app so the brand disappears from the list
+        if st.button("Remove Brand", key=f"remove_{key_prefix}_{brand['id']}"):
+            st.session_state["brands"] = [b for b in st.session_state["brands"] if b["id"] != brand["id"]]
+            st.rerun()
+
+# Render one page of a brand list with a page selector when it does not fit on one page
+def render_brand_list(brands, role, label, key_prefix):
+    """Show the brand editors for the current page of the given brand list."""
+    page_count = max(1, -(-len(brands) // BRAND_PAGE_SIZE))
+    page_key = f"{role}_brand_page"
+    if st.session_state.get(page_key, 1) > page_count:
+        st.session_state[page_key] = page_count
+    page = 1
+    if page_count > 1:
+        page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, step=1, key=page_key)
+    offset = (page - 1) * BRAND_PAGE_SIZE
+    for i, brand in enumerate(brands[offset:offset + BRAND_PAGE_SIZE], start=offset + 1):
+        render_brand_editor(brand, f"{label} {i}", key_prefix)
+
+# Callback for the discovery form, adds the selected suggestions to the brand list
+def add_discovered_keywords(keyword_suggestions, brand_suggestions):
+    """Append selected keyword ideas to their brands and add selected candidates as competitor brands."""
+    def selected_rows(editor_key, suggestions):
+        edited_rows = (st.session_state.pop(editor_key, None) or {}).get("edited_rows", {})
+        return [suggestions.iloc[int(i)] for i, edits in edited_rows.items() if edits.get("add")]
+    
+    brands_by_name = {}
+    for brand in st.session_state["brands"]:
+        brands_by_name.setdefault(brand["name"], brand)
+    
+    added_keywords = 0
+    for row in selected_rows("discovery_keywords", keyword_suggestions):
+        brand = brands_by_name.get(row["brand"])
+        if brand is not None and row["keyword"] not in brand["keywords"]:
+            brand["keywords"] = [k for k in brand["keywords"] if k.strip()] + [row["keyword"]]
+            added_keywords += 1
+    
+    added_brands = 0
+    competitor_count = len(index_brands(st.session_state["brands"])["competitor"])
+    for row in selected_rows("discovery_brands", brand_suggestions):
+        st.session_state["brands"].append({
+            "id": str(uuid.uuid4()),
+            "name": row["candidate_brand"],
+            "keywords": row["keywords"].split(", "),
+            "isOwnBrand": False,
+            "color": DEFAULT_BRAND_COLORS[(competitor_count + added_brands) % len(DEFAULT_BRAND_COLORS)]
+        })
+        added_brands += 1
+    
+    reset_editor_widgets()
+    st.session_state["discovery_message"] = (
+        f"Added {added_keywords} keywords and {added_brands} competitor brands. "
+        "Generate the results again to include them."
+    )
+
 # App title and introduction
 st.title("📊 Share of Brand Search Tool")
 st.markdown("""
@@ -464,9 +641,6 @@ This tool helps you analyze brand search volumes from Google Ads and visualize m
 Compare your brands against competitors to gain insights into search performance.
 """)
 
-# Initialize Google Ads client
-google_ads_client = get_google_ads_client()
-
 # Initialize session state variables
 if "brands" not in st.session_state:
     st.session_state["brands"] = [
@@ -485,7 +659,8 @@ if "settings" not in st.session_state:
         "network": "GOOGLE_SEARCH",
         "dateFrom": start_date.strftime("%Y-%m"),  # Last year
         "dateTo": end_date.strftime("%Y-%m"),  # Current month - 1
-        "granularity": "monthly"
+        "granularity": "monthly",
+        "fiscalStartMonth": 1
     }
 
 if "results" not in st.session_state:
@@ -500,96 +675,110 @@ tabs = st.tabs(["Input Parameters", "Results"] if st.session_state["show_results
 with tabs[0]:
     st.header("Brand Configuration")
     
-    # Create two columns
-    col1, col2 = st.columns([1, 1])
-    
-    with col1:
-        st.subheader("Your Brands")
-        
-        # Function to add a new brand
-        def add_brand(is_own_brand):
-            colors = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", 
-                      "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf"]
-            
-            brand_count = len([b for b in st.session_state["brands"] if b["isOwnBrand"] == is_own_brand])
-            st.session_state["brands"].append({
-                "id": str(uuid.uuid4()),
-                "name": "",
-                "keywords": [""],
-                "isOwnBrand": is_own_brand,
-                "color": colors[brand_count % len(colors)]
-            })
-        
-        # Display own brands
-        own_brands = [b for b in st.session_state["brands"] if b["isOwnBrand"]]
-        if not own_brands:
-            st.info("Add your own brands to track")
-        
-        for i, brand in enumerate(own_brands):
-            with st.expander(f"Brand {i+1}: {brand['name'] or 'Unnamed'}", expanded=brand["name"] == ""):
-                # Brand name
-                new_name = st.text_input("Brand Name", brand["name"], key=f"own_name_{brand['id']}")
-                if new_name != brand["name"]:
-                    brand["name"] = new_name
-                
-                # Brand color
-                new_color = st.color_picker("Brand Color", brand["color"], key=f"own_color_{brand['id']}")
-                if new_color != brand["color"]:
-                    brand["color"] = new_color
-                
-                # Keywords
-                st.write("Keywords (one per line):")
-                keywords_text = "\n".join(brand["keywords"])
-                new_keywords = st.text_area("", keywords_text, key=f"own_keywords_{brand['id']}")
-                if new_keywords != keywords_text:
-                    brand["keywords"] = [k.strip() for k in new_keywords.split("\n") if k.strip()]
-                    if not brand["keywords"]:
-                        brand["keywords"] = [""]
-                
-                # Remove brand button
-                if st.button("Remove Brand", key=f"remove_own_{brand['id']}"):
-                    st.session_state["brands"] = [b for b in st.session_state["brands"] if b["id"] != brand["id"]]
-                    st.rerun()
-        
-        if st.button("➕ Add Your Brand"):
-            add_brand(True)
-            st.rerun()
+    # Save, load and compare whole configurations
+    with st.expander("📁 Project File"):
+        if "project_message" in st.session_state:
+            level, message = st.session_state.pop("project_message")
+            (st.success if level == "success" else st.error)(message)
         
-        st.subheader("Competitor Brands")
+        project_types = ["json", "yaml", "yml"] if yaml_available() else ["json"]
+        st.file_uploader("Load project", type=project_types, key="project_upload", on_change=load_project_file)
         
-        competitor_brands = [b for b in st.session_state["brands"] if not b["isOwnBrand"]]
-        if not competitor_brands:
-            st.info("Add competitor brands to compare")
+        # The project file is only serialized when the user asks to save it. Brand edits rerun only their
+        # fragment, so building it in the button's full rerun also guarantees it includes every edit
+        col_export1, col_export2 = st.columns(2)
+        with col_export1:
+            project_format = st.selectbox(
+                "Save as", options=["json", "yaml"] if yaml_available() else ["json"], format_func=str.upper,
+                key="project_format"
+            )
+        with col_export2:
+            if st.button("💾 Prepare Project File"):
+                st.download_button(
+                    label=f"Download {project_format.upper()}",
+                    data=export_project(st.session_state["brands"], st.session_state["settings"], project_format),
+                    file_name=f"share_of_search_project_{datetime.now().strftime('%Y%m%d')}.{project_format}",
+                    mime="application/json" if project_format == "json" else "application/x-yaml"
+                )
         
-        for i, brand in enumerate(competitor_brands):
-            with st.expander(f"Competitor {i+1}: {brand['name'] or 'Unnamed'}", expanded=brand["name"] == ""):
-                # Brand name
-                new_name = st.text_input("Brand Name", brand["name"], key=f"comp_name_{brand['id']}")
-                if new_name != brand["name"]:
-                    brand["name"] = new_name
-                
-                # Brand color
-                new_color = st.color_picker("Brand Color", brand["color"], key=f"comp_color_{brand['id']}")
-                if new_color != brand["color"]:
-                    brand["color"] = new_color
-                
-                # Keywords
-                st.write("Keywords (one per line):")
-                keywords_text = "\n".join(brand["keywords"])
-                new_keywords = st.text_area("", keywords_text, key=f"comp_keywords_{brand['id']}")
-                if new_keywords != keywords_text:
-                    brand["keywords"] = [k.strip() for k in new_keywords.split("\n") if k.strip()]
-                    if not brand["keywords"]:
-                        brand["keywords"] = [""]
-                
-                # Remove brand button
-                if st.button("Remove Brand", key=f"remove_comp_{brand['id']}"):
-                    st.session_state["brands"] = [b for b in st.session_state["brands"] if b["id"] != brand["id"]]
-                    st.rerun()
+        st.markdown("**Compare Projects**")
+        col_diff1, col_diff2 = st.columns(2)
+        with col_diff1:
+            diff_old = st.file_uploader("Before", type=project_types, key="diff_old")
+        with col_diff2:
+            diff_new = st.file_uploader("After (defaults to the current configuration)", type=project_types, key="diff_new")
         
-        if st.button("➕ Add Competitor Brand"):
-            add_brand(False)
-            st.rerun()
+        # Compared on click for the same reason as saving, so the current configuration includes fragment edits
+        if diff_old is not None and st.button("🔍 Compare"):
+            try:
+                old_brands, old_settings = parse_project(
+                    diff_old.getvalue().decode("utf-8"),
+                    "yaml" if diff_old.name.lower().endswith((".yaml", ".yml")) else "json"
+                )
+                if diff_new is not None:
+                    new_brands, new_settings = parse_project(
+                        diff_new.getvalue().decode("utf-8"),
+                        "yaml" if diff_new.name.lower().endswith((".yaml", ".yml")) else "json"
+                    )
+                else:
+                    new_brands, new_settings = st.session_state["brands"], st.session_state["settings"]
+                differences = diff_projects(old_brands, old_settings, new_brands, new_settings)
+                if differences:
+                    st.dataframe(differences, use_container_width=True, hide_index=True)
+                    st.caption("For keywords, 'before' lists removed keywords and 'after' lists added ones.")
+                else:
+                    st.info("The configurations are identical.")
+            except (ValueError, UnicodeDecodeError) as e:
+                st.error(f"Could not compare projects: {e}")
+    
+    bulk_edit = st.toggle("Bulk edit brands", help="Edit all brands in a single table")
+    
+    # Create two columns
+    col1, col2 = st.columns([1, 1])
+    
+    # Brands grouped by role, shared by the brand lists and the generate button
+    brand_index = index_brands(st.session_state["brands"])
+    
+    with col1:
+        if bulk_edit:
+            st.subheader("All Brands")
+            import pandas as pd
+            
+            # Edits are only applied on submit, so typing in the table does not rerun the app
+            with st.form("bulk_edit_form"):
+                st.data_editor(
+                    pd.DataFrame(brands_to_rows(st.session_state["brands"]),
+                                 columns=["id", "name", "isOwnBrand", "color", "keywords"]),
+                    key="bulk_editor",
+                    num_rows="dynamic",
+                    hide_index=True,
+                    use_container_width=True,
+                    column_order=["name", "isOwnBrand", "color", "keywords"],
+                    column_config={
+                        "name": st.column_config.TextColumn("Brand Name"),
+                        "isOwnBrand": st.column_config.CheckboxColumn("Own Brand", default=False),
+                        "color": st.column_config.TextColumn("Color", validate=r"^#[0-9a-fA-F]{6}$"),
+                        "keywords": st.column_config.TextColumn("Keywords", help="Separate keywords with commas")
+                    }
+                )
+                st.form_submit_button("Apply Changes", on_click=apply_bulk_edits)
+        else:
+            st.subheader("Your Brands")
+            
+            # Display own brands
+            if not brand_index["own"]:
+                st.info("Add your own brands to track")
+            render_brand_list(brand_index["own"], "own", "Brand", "own")
+            
+            st.button("➕ Add Your Brand", on_click=add_brand, args=(True,))
+            
+            st.subheader("Competitor Brands")
+            
+            if not brand_index["competitor"]:
+                st.info("Add competitor brands to compare")
+            render_brand_list(brand_index["competitor"], "competitor", "Competitor", "comp")
+            
+            st.button("➕ Add Competitor Brand", on_click=add_brand, args=(False,))
     
     with col2:
         st.subheader("Search Parameters")
@@ -649,11 +838,7 @@ with tabs[0]:
             )
             
             # Month selector
-            months = [
-                (1, "January"), (2, "February"), (3, "March"), (4, "April"),
-                (5, "May"), (6, "June"), (7, "July"), (8, "August"),
-                (9, "September"), (10, "October"), (11, "November"), (12, "December")
-            ]
+            months = list(MONTHS)
             month_options = [m[1] for m in months]
             selected_from_month = st.selectbox(
                 "Month",
@@ -727,44 +912,71 @@ with tabs[0]:
         # Data Granularity
         st.session_state["settings"]["granularity"] = st.radio(
             "Data Granularity",
-            options=["monthly", "quarterly", "yearly"],
-            index=["monthly", "quarterly", "yearly"].index(st.session_state["settings"]["granularity"]),
+            options=list(GRANULARITIES),
+            index=GRANULARITIES.index(st.session_state["settings"]["granularity"]),
             horizontal=True
         )
         
+        # Fiscal year start, only relevant when months are grouped into quarters or years
+        if st.session_state["settings"]["granularity"] != "monthly":
+            fiscal_start_month = st.session_state["settings"].get("fiscalStartMonth", 1)
+            selected_fiscal_start = st.selectbox(
+                "Fiscal Year Starts In",
+                options=month_options,
+                index=fiscal_start_month - 1,
+                help="Quarters and years follow this fiscal calendar. Fiscal years are named after the year they end in."
+            )
+            st.session_state["settings"]["fiscalStartMonth"] = month_options.index(selected_fiscal_start) + 1
+        
         # Generate Results Button
         st.markdown("### Generate Results")
         
-        valid_brands = [b for b in st.session_state["brands"] 
-                       if b["name"] and any(k.strip() for k in b["keywords"])]
-        
-        if len(valid_brands) < 1:
-            st.warning("Please add at least one brand with a name and keywords.")
-        else:
-            if st.button("🔍 Generate Search Volume Data", type="primary"):
+        # Brand edits inside fragments do not rerun this part of the page, so validate on click
+        if st.button("🔍 Generate Search Volume Data", type="primary"):
+            valid_brands = index_brands(st.session_state["brands"])["valid"]
+            if len(valid_brands) < 1:
+                st.warning("Please add at least one brand with a name and keywords.")
+            else:
                 with st.spinner("Fetching search volume data from Google Ads..."):
+                    # The client is created on first use, not when the page first loads
+                    google_ads_client = get_google_ads_client()
+                    
                     # Get search volumes using the Google Ads client
-                    results = get_search_volumes(valid_brands, st.session_state["settings"], google_ads_client)
+                    keyword_ideas = []
+                    results = get_search_volumes(
+                        valid_brands, st.session_state["settings"], google_ads_client, collected_ideas=keyword_ideas
+                    )
                     
                     if results:
                         st.session_state["results"] = results
+                        st.session_state["results_settings"] = dict(st.session_state["settings"])
+                        st.session_state["keyword_ideas"] = {
+                            "dateFrom": st.session_state["settings"]["dateFrom"],
+                            "dateTo": st.session_state["settings"]["dateTo"],
+                            "ideas": keyword_ideas
+                        }
                         st.session_state["show_results"] = True
                         st.rerun()
                     else:
                         st.error("No data found for the selected parameters.")
+        elif not brand_index["valid"]:
+            st.caption("Add at least one brand with a name and keywords.")
 
 # Results tab (only shown after generating results)
 if st.session_state["show_results"] and len(tabs) > 1:
     with tabs[1]:
         st.header("Share of Search Results")
         
+        import pandas as pd
+        import plotly.express as px
+        
         # Convert results to DataFrame
         df = pd.DataFrame(st.session_state["results"])
         
         # Create visualization options
         viz_type = st.radio(
             "Visualization Type",
-            options=["Share of Search (%)", "Search Volume", "Data Table"],
+            options=["Share of Search (%)", "Search Volume", "Data Table", "Keyword Discovery", "Revisions"],
             horizontal=True
         )
         
@@ -812,6 +1024,108 @@ if st.session_state["show_results"] and len(tabs) > 1:
             
             st.plotly_chart(fig, use_container_width=True)
             
+        elif viz_type == "Keyword Discovery":
+            from keyword_discovery import discover_keywords
+            
+            if "discovery_message" in st.session_state:
+                st.success(st.session_state.pop("discovery_message"))
+            
+            discovery = st.session_state.get("keyword_ideas")
+            if not discovery or not discovery["ideas"]:
+                st.info("Keyword Planner returned no related queries beyond your brand keywords.")
+            else:
+                st.caption("Related queries that Keyword Planner returned with your results but none of your keywords cover, "
+                           "ranked by search volume and growth.")
+                keyword_suggestions, brand_suggestions = discover_keywords(
+                    discovery["ideas"], st.session_state["brands"], discovery["dateFrom"], discovery["dateTo"]
+                )
+                suggestion_columns = {
+                    "add": st.column_config.CheckboxColumn("Add", default=False),
+                    "avg_monthly_searches": st.column_config.NumberColumn("Avg. Monthly Searches"),
+                    "growth": st.column_config.NumberColumn(
+                        "Growth", format="%.2f", help="Relative change between the first and last months of the range"
+                    ),
+                    "score": st.column_config.ProgressColumn("Score", min_value=0, max_value=1)
+                }
+                
+                with st.form("discovery_form"):
+                    st.markdown("**Suggested Keywords for Existing Brands**")
+                    if keyword_suggestions.empty:
+                        st.info("No unmatched queries mention one of your brands.")
+                    else:
+                        st.data_editor(
+                            keyword_suggestions.assign(add=False),
+                            key="discovery_keywords",
+                            hide_index=True,
+                            use_container_width=True,
+                            disabled=list(keyword_suggestions.columns),
+                            column_order=["add", "brand", "keyword", "avg_monthly_searches", "growth", "score"],
+                            column_config=suggestion_columns
+                        )
+                    
+                    st.markdown("**Candidate Competitor Brands**")
+                    if brand_suggestions.empty:
+                        st.info("No group of unmatched queries points to a new brand.")
+                    else:
+                        st.data_editor(
+                            brand_suggestions.assign(add=False),
+                            key="discovery_brands",
+                            hide_index=True,
+                            use_container_width=True,
+                            disabled=list(brand_suggestions.columns),
+                            column_order=["add", "candidate_brand", "keywords", "ideas", "total_monthly_searches", "score"],
+                            column_config=suggestion_columns
+                        )
+                    
+                    st.form_submit_button(
+                        "➕ Add Selected", on_click=add_discovered_keywords, args=(keyword_suggestions, brand_suggestions)
+                    )
+            
+        elif viz_type == "Revisions":
+            results_settings = st.session_state.get("results_settings", st.session_state["settings"])
+            location_id = COUNTRY_MAPPING.get(results_settings["location"], "2840")
+            customer_id = st.secrets["GOOGLE_CUSTOMER_ID"]
+            snapshot_store = get_snapshot_store()
+            snapshot_dates = snapshot_store.snapshot_dates(customer_id, location_id, results_settings["network"])
+            
+            st.caption("Google revises recent monthly estimates. Every fetch is kept as a snapshot, "
+                       "compare two of them to see which values changed.")
+            if len(snapshot_dates) < 2:
+                st.info("Revisions can be compared once this market has been fetched on at least two different days.")
+            else:
+                col_before, col_after = st.columns(2)
+                with col_before:
+                    before_date = st.selectbox("Snapshot from", options=snapshot_dates, index=len(snapshot_dates) - 2,
+                                               format_func=lambda d: d.isoformat())
+                with col_after:
+                    after_date = st.selectbox("Compared with snapshot from", options=snapshot_dates,
+                                              index=len(snapshot_dates) - 1, format_func=lambda d: d.isoformat())
+                
+                keyword_brands = {}
+                for brand in st.session_state["brands"]:
+                    for keyword in brand["keywords"]:
+                        if keyword.strip():
+                            keyword_brands.setdefault(keyword.strip().lower(), brand["name"])
+                
+                revisions = snapshot_store.compare(
+                    customer_id, location_id, results_settings["network"], keyword_brands.keys(), before_date, after_date
+                )
+                if not revisions:
+                    st.info("None of your keywords changed between these snapshots.")
+                else:
+                    revisions_df = pd.DataFrame(revisions)
+                    revisions_df.insert(0, "brand", revisions_df["keyword"].map(keyword_brands))
+                    
+                    # Net change of each brand's monthly volume
+                    st.markdown("**Changes by Brand**")
+                    brand_changes = revisions_df.pivot_table(
+                        index="month", columns="brand", values="change", aggfunc="sum", fill_value=0
+                    )
+                    st.dataframe(brand_changes, use_container_width=True)
+                    
+                    st.markdown("**Revised Keyword Values**")
+                    st.dataframe(revisions_df, use_container_width=True, hide_index=True)
+            
         else:  # Data Table
             # Group by period and calculate totals
             periods = sorted(df["period"].unique())
@@ -831,13 +1145,23 @@ if st.session_state["show_results"] and len(tabs) > 1:
         # Export options
         st.subheader("Export Options")
         
-        # Export as CSV
-        csv = df.to_csv(index=False)
+        col_format, col_compression = st.columns(2)
+        with col_format:
+            export_format = st.selectbox("Format", options=available_formats(), format_func=str.upper, key="export_format")
+        with col_compression:
+            export_compression = st.selectbox(
+                "Compression", options=available_compressions(export_format), key="export_compression"
+            )
+        
+        # The export is only written when the download is clicked, in chunks to a temporary file
+        export_name = export_file_name(
+            f"share_of_search_data_{datetime.now().strftime('%Y%m%d')}", export_format, export_compression
+        )
         st.download_button(
-            label="📄 Download CSV",
-            data=csv,
-            file_name=f"share_of_search_data_{datetime.now().strftime('%Y%m%d')}.csv",
-            mime="text/csv"
+            label=f"📄 Download {export_name}",
+            data=functools.partial(read_export, st.session_state["results"], export_format, export_compression),
+            file_name=export_name,
+            mime=export_mime_type(export_name)
         )
 
 # Footer
@@ -0,0 +1,184 @@
+import re
+
+from period_calendar import build_calendar
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Weight of the volume rank in the discovery score, the rest goes to growth
+VOLUME_WEIGHT = 0.7
+
+# Number of months at each end of the range compared to measure growth
+GROWTH_WINDOW = 3
+
+# Filler and shopping words that never name a brand, whichever seeds returned them
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "at", "best", "buy", "by", "cheap", "cost", "deal", "deals", "for", "free", "from",
+    "how", "in", "is", "me", "my", "near", "new", "of", "on", "online", "or", "price", "prices", "review",
+    "reviews", "sale", "shop", "store", "the", "to", "top", "used", "vs", "what", "where", "which", "with", "your"
+})
+
+
+def tokenize(text):
+    """Split a query into a set of lowercase word tokens."""
+    return set(_TOKEN_PATTERN.findall(text.lower()))
+
+
+def score_ideas(ideas, date_from, date_to):
+    """Score keyword ideas by volume and growth over the selected months.
+
+    ``ideas`` are dicts with "text", "source_brand" and "monthly_search_volumes"
+    ([year, month, searches] lists). Ideas returned for several brands are merged.
+    Returns a DataFrame indexed by lowercase keyword with avg_monthly_searches,
+    growth (relative change between the first and last months) and a 0-1 score
+    that blends the volume and growth percentile ranks.
+    """
+    import pandas as pd
+
+    months = [(row.year, row.month) for row in build_calendar(date_from, date_to)]
+    rows = [
+        (idea["text"].lower(), year, month, searches or 0)
+        for idea in ideas
+        for year, month, searches in idea["monthly_search_volumes"]
+    ]
+    columns = ["keyword", "year", "month", "searches"]
+    if not rows:
+        return pd.DataFrame(columns=["avg_monthly_searches", "growth", "score", "source_brands"])
+
+    volumes = pd.DataFrame(rows, columns=columns).drop_duplicates(["keyword", "year", "month"])
+    # Keyword x month matrix over the selected range, months without data count as zero
+    matrix = volumes.pivot(index="keyword", columns=["year", "month"], values="searches")
+    matrix = matrix.reindex(columns=pd.MultiIndex.from_tuples(months, names=["year", "month"])).fillna(0)
+
+    window = min(GROWTH_WINDOW, max(1, len(months) // 2))
+    first = matrix.iloc[:, :window].mean(axis=1)
+    last = matrix.iloc[:, -window:].mean(axis=1)
+
+    scores = pd.DataFrame({
+        "avg_monthly_searches": matrix.mean(axis=1).round().astype(int),
+        # At least one search in the denominator, so new queries rank as fast growing instead of dividing by zero
+        "growth": ((last - first) / first.clip(lower=1)).round(3)
+    })
+    scores["score"] = (
+        VOLUME_WEIGHT * scores["avg_monthly_searches"].rank(pct=True)
+        + (1 - VOLUME_WEIGHT) * scores["growth"].rank(pct=True)
+    ).round(3)
+
+    sources = pd.DataFrame(
+        [(idea["text"].lower(), idea["source_brand"]) for idea in ideas], columns=["keyword", "source_brand"]
+    ).drop_duplicates()
+    scores["source_brands"] = sources.groupby("keyword")["source_brand"].agg(", ".join)
+    return scores
+
+
+def discover_keywords(ideas, brands, date_from, date_to, min_cluster_size=2, limit=50):
+    """Rank the ideas that match no brand keyword and suggest where they belong.
+
+    Returns (keyword_suggestions, brand_suggestions). Keyword suggestions assign
+    an idea to the existing brand that covers the most of its tokens, through a
+    token of the brand name or a brand keyword whose tokens all appear in the
+    idea. Ideas that match no brand are grouped by their most common distinctive
+    token, and groups of at least ``min_cluster_size`` ideas become candidate
+    competitor brands. Category words never form a candidate brand: tokens of
+    ideas assigned to two or more brands (e.g. "cars", "dealer") and
+    ``STOPWORDS``. Queries returned for several seed brands are not category
+    words by themselves, competitors are often exactly those queries.
+    """
+    import numpy as np
+    import pandas as pd
+
+    scores = score_ideas(ideas, date_from, date_to)
+    known_keywords = {k.strip().lower() for brand in brands for k in brand["keywords"] if k.strip()}
+    scores = scores[~scores.index.isin(known_keywords)]
+
+    keyword_columns = ["brand", "keyword", "avg_monthly_searches", "growth", "score", "overlap"]
+    brand_columns = ["candidate_brand", "keywords", "ideas", "total_monthly_searches", "score"]
+    if scores.empty:
+        return pd.DataFrame(columns=keyword_columns), pd.DataFrame(columns=brand_columns)
+
+    # Name tokens match on their own, a keyword only when all its tokens are in the idea, so "skoda auto"
+    # does not claim "hyundai auto". Stopwords and tokens of several brands identify no brand.
+    named_brands = [brand for brand in brands if brand["name"]]
+    brand_vocabularies = [
+        tokenize(" ".join([brand["name"]] + [k for k in brand["keywords"] if k.strip()])) - STOPWORDS
+        for brand in named_brands
+    ]
+    token_brand_counts = pd.Series([token for tokens in brand_vocabularies for token in tokens]).value_counts()
+    shared_tokens = set(token_brand_counts[token_brand_counts > 1].index)
+    units = []
+    for brand_index, brand in enumerate(named_brands):
+        name_tokens = tokenize(brand["name"]) - STOPWORDS
+        units += [(brand_index, {token}) for token in name_tokens]
+        for keyword in brand["keywords"]:
+            tokens = tokenize(keyword) - STOPWORDS - shared_tokens
+            if tokens - name_tokens:
+                units.append((brand_index, tokens))
+
+    vocabulary = sorted(set().union(*(tokens for _, tokens in units)))
+    idea_tokens = pd.Series([tokenize(keyword) for keyword in scores.index], index=scores.index)
+
+    # Binary idea x token and unit x token matrices, so matching is a single matrix product
+    token_index = {token: i for i, token in enumerate(vocabulary)}
+    idea_matrix = np.zeros((len(scores), len(vocabulary)))
+    for row, tokens in enumerate(idea_tokens):
+        for token in tokens & token_index.keys():
+            idea_matrix[row, token_index[token]] = 1
+    unit_matrix = np.zeros((len(units), len(vocabulary)))
+    for row, (_, tokens) in enumerate(units):
+        for token in tokens:
+            unit_matrix[row, token_index[token]] = 1
+    unit_brands = np.array([brand_index for brand_index, _ in units], dtype=int)
+
+    matched = (idea_matrix @ unit_matrix.T) == unit_matrix.sum(axis=1)
+    overlap = np.zeros((len(scores), len(named_brands)))
+    for brand_index in range(len(named_brands)):
+        brand_units = unit_brands == brand_index
+        # Idea tokens covered by at least one fully matched unit of the brand
+        overlap[:, brand_index] = ((matched[:, brand_units] @ unit_matrix[brand_units]) > 0).sum(axis=1)
+
+    token_counts = idea_tokens.map(len).clip(lower=1).to_numpy()
+    best_overlap = overlap.max(axis=1) if named_brands else np.zeros(len(scores))
+    best_brand = overlap.argmax(axis=1) if named_brands else np.zeros(len(scores), dtype=int)
+
+    scores = scores.assign(overlap=(best_overlap / token_counts).round(3))
+    assigned = best_overlap > 0
+
+    keyword_suggestions = scores[assigned].assign(
+        brand=[named_brands[i]["name"] for i in best_brand[assigned]]
+    ).rename_axis("keyword").reset_index()
+    keyword_suggestions = keyword_suggestions.sort_values("score", ascending=False).head(limit)[keyword_columns]
+
+    # Category words: tokens that show up in ideas assigned to more than one brand
+    assigned_tokens = pd.DataFrame({
+        "token": idea_tokens[assigned].to_numpy(),
+        "brand": best_brand[assigned]
+    }).explode("token")
+    brands_per_token = assigned_tokens.groupby("token")["brand"].nunique()
+    category_tokens = set(brands_per_token[brands_per_token > 1].index) | STOPWORDS
+
+    unassigned = scores[~assigned].assign(token=idea_tokens[~assigned]).explode("token").dropna(subset=["token"])
+    unassigned = unassigned[
+        ~unassigned["token"].isin(category_tokens)
+        & (unassigned["token"].str.len() >= 3)
+        & ~unassigned["token"].str.isdigit()
+    ]
+    if unassigned.empty:
+        return keyword_suggestions.reset_index(drop=True), pd.DataFrame(columns=brand_columns)
+
+    # Each idea joins the cluster of its token that appears in the most ideas, ties go to volume
+    token_stats = unassigned.groupby("token").agg(ideas=("score", "size"), volume=("avg_monthly_searches", "sum"))
+    unassigned = unassigned.join(token_stats, on="token").rename_axis("keyword").reset_index()
+    unassigned = unassigned.sort_values(["ideas", "volume"], ascending=False).drop_duplicates("keyword")
+
+    clusters = unassigned.sort_values("score", ascending=False).groupby("token").agg(
+        keywords=("keyword", lambda keywords: ", ".join(keywords)),
+        ideas=("keyword", "size"),
+        total_monthly_searches=("avg_monthly_searches", "sum"),
+        score=("score", "mean")
+    )
+    clusters = clusters[clusters["ideas"] >= min_cluster_size]
+    clusters = clusters.rename_axis("candidate_brand").reset_index()
+    clusters["candidate_brand"] = clusters["candidate_brand"].str.title()
+    clusters["score"] = clusters["score"].round(3)
+    clusters = clusters.sort_values(["total_monthly_searches", "score"], ascending=False).head(limit)
+
+    return keyword_suggestions.reset_index(drop=True), clusters[brand_columns].reset_index(drop=True)
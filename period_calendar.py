@@ -0,0 +1,93 @@
+import calendar
+from collections import namedtuple
+from datetime import date
+from functools import lru_cache
+
+MONTHS = tuple((month, calendar.month_name[month]) for month in range(1, 13))
+
+GRANULARITIES = ("monthly", "quarterly", "yearly")
+
+CalendarMonth = namedtuple("CalendarMonth", [
+    "year", "month", "month_label",
+    "fiscal_year", "fiscal_quarter", "quarter_label", "year_label",
+    "month_start", "month_end"
+])
+
+
+def add_months(year, month, count):
+    """Return the (year, month) that lies ``count`` months after the given one."""
+    index = year * 12 + (month - 1) + count
+    return index // 12, index % 12 + 1
+
+
+def parse_month(value):
+    """Parse a "YYYY-MM" string into a (year, month) tuple."""
+    year, month = value.split("-")
+    year, month = int(year), int(month)
+    if not 1 <= month <= 12:
+        raise ValueError(f"Invalid month in '{value}'.")
+    return year, month
+
+
+def fiscal_period(year, month, fiscal_start_month=1):
+    """Return (fiscal_year, fiscal_quarter) for a calendar month.
+
+    A fiscal year is named after the calendar year in which it ends, so with an
+    April start, April 2024 to March 2025 is fiscal year 2025.
+    """
+    offset = (month - fiscal_start_month) % 12
+    fiscal_year = year if fiscal_start_month == 1 or month < fiscal_start_month else year + 1
+    return fiscal_year, offset // 3 + 1
+
+
+@lru_cache(maxsize=256)
+def build_calendar(date_from, date_to, fiscal_start_month=1):
+    """Return an immutable tuple with one CalendarMonth per month from date_from to date_to inclusive.
+
+    Calendar years keep the "2024" and "2024-Q1" labels; other fiscal start months
+    are labelled "FY2025" and "FY2025-Q1". Month bounds are ISO 8601 dates.
+    """
+    if not 1 <= fiscal_start_month <= 12:
+        raise ValueError("Fiscal year start month must be between 1 and 12.")
+    start, end = parse_month(date_from), parse_month(date_to)
+    if start > end:
+        raise ValueError(f"Start month {date_from} is after end month {date_to}.")
+
+    prefix = "" if fiscal_start_month == 1 else "FY"
+    rows = []
+    year, month = start
+    while (year, month) <= end:
+        fiscal_year, fiscal_quarter = fiscal_period(year, month, fiscal_start_month)
+        rows.append(CalendarMonth(
+            year=year,
+            month=month,
+            month_label=f"{year}-{month:02d}",
+            fiscal_year=fiscal_year,
+            fiscal_quarter=fiscal_quarter,
+            quarter_label=f"{prefix}{fiscal_year}-Q{fiscal_quarter}",
+            year_label=f"{prefix}{fiscal_year}",
+            month_start=date(year, month, 1).isoformat(),
+            month_end=date(year, month, calendar.monthrange(year, month)[1]).isoformat()
+        ))
+        year, month = add_months(year, month, 1)
+    return tuple(rows)
+
+
+def period_table(date_from, date_to, granularity, fiscal_start_month=1):
+    """Return a month -> period mapping table for joining against monthly volumes.
+
+    Columns are year, month, period, period_start and period_end. Periods at the
+    edges of the range are clipped to it, so a partial quarter or year only spans
+    the selected months.
+    """
+    import pandas as pd
+
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity '{granularity}'.")
+    table = pd.DataFrame(build_calendar(date_from, date_to, fiscal_start_month), columns=CalendarMonth._fields)
+    label_column = {"monthly": "month_label", "quarterly": "quarter_label", "yearly": "year_label"}[granularity]
+    table["period"] = table[label_column]
+    bounds = table.groupby("period", sort=False)
+    table["period_start"] = bounds["month_start"].transform("min")
+    table["period_end"] = bounds["month_end"].transform("max")
+    return table[["year", "month", "period", "period_start", "period_end"]]
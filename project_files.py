@@ -0,0 +1,214 @@
+import importlib.util
+import json
+import re
+import uuid
+
+PROJECT_FORMAT_VERSION = 1
+
+DEFAULT_BRAND_COLORS = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd",
+                        "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf"]
+
+SETTINGS_KEYS = ["location", "network", "dateFrom", "dateTo", "granularity", "fiscalStartMonth"]
+
+_COLOR_PATTERN = re.compile(r"^#[0-9a-fA-F]{6}$")
+_MONTH_PATTERN = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+
+
+def yaml_available():
+    """Return True when PyYAML is installed and YAML project files can be used."""
+    return importlib.util.find_spec("yaml") is not None
+
+
+def _load_yaml():
+    # YAML support is optional and only imported when a YAML file is read or written
+    if not yaml_available():
+        raise ValueError("YAML project files require the PyYAML package.")
+    import yaml
+    return yaml
+
+
+def split_keywords(text, separator="\n"):
+    """Split keyword text into a cleaned list, keeping the [""] placeholder used by the editor."""
+    keywords = [k.strip() for k in (text or "").split(separator) if k.strip()]
+    return keywords or [""]
+
+
+def export_project(brands, settings, fmt="json"):
+    """Serialize brands and settings into a JSON or YAML project file."""
+    project = {
+        "version": PROJECT_FORMAT_VERSION,
+        "brands": [
+            {
+                "name": brand["name"],
+                "keywords": [k for k in brand["keywords"] if k.strip()],
+                "isOwnBrand": bool(brand["isOwnBrand"]),
+                "color": brand["color"]
+            }
+            for brand in brands
+        ],
+        "settings": {key: settings[key] for key in SETTINGS_KEYS if key in settings}
+    }
+    if fmt == "yaml":
+        return _load_yaml().safe_dump(project, sort_keys=False, allow_unicode=True)
+    return json.dumps(project, indent=2, ensure_ascii=False)
+
+
+def parse_project(text, fmt="json"):
+    """Parse and validate a project file, returning (brands, settings).
+
+    Brands get fresh IDs so they never collide with widgets of the current session.
+    Raises ValueError when the file cannot be used.
+    """
+    if fmt == "yaml":
+        yaml = _load_yaml()
+        try:
+            project = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Could not read project file: {e}")
+    else:
+        try:
+            project = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Could not read project file: {e}")
+
+    if not isinstance(project, dict):
+        raise ValueError("Project file must contain a mapping with 'brands' and 'settings'.")
+    version = project.get("version", PROJECT_FORMAT_VERSION)
+    if isinstance(version, bool) or not isinstance(version, int) or version > PROJECT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported project file version: {version}.")
+
+    raw_brands = project.get("brands") or []
+    if not isinstance(raw_brands, list):
+        raise ValueError("'brands' must be a list.")
+
+    brands = []
+    role_counts = {True: 0, False: 0}
+    for i, raw_brand in enumerate(raw_brands):
+        if not isinstance(raw_brand, dict):
+            raise ValueError(f"Brand {i + 1} must be a mapping.")
+        name = raw_brand.get("name") or ""
+        if not isinstance(name, str):
+            raise ValueError(f"Brand {i + 1}: 'name' must be a string.")
+        keywords = raw_brand.get("keywords") or []
+        if isinstance(keywords, str):
+            keywords = keywords.split("\n")
+        elif not isinstance(keywords, list):
+            raise ValueError(f"Brand {i + 1}: 'keywords' must be a list or a string with one keyword per line.")
+        # YAML reads keywords such as 911 as numbers, anything nested is a mistake
+        if any(isinstance(k, (list, dict)) for k in keywords):
+            raise ValueError(f"Brand {i + 1}: every keyword must be a single value.")
+        is_own_brand = raw_brand.get("isOwnBrand", False)
+        if not isinstance(is_own_brand, bool):
+            raise ValueError(f"Brand {i + 1}: 'isOwnBrand' must be true or false.")
+        color = str(raw_brand.get("color") or "")
+        if not _COLOR_PATTERN.match(color):
+            color = DEFAULT_BRAND_COLORS[role_counts[is_own_brand] % len(DEFAULT_BRAND_COLORS)]
+        role_counts[is_own_brand] += 1
+        brands.append({
+            "id": str(uuid.uuid4()),
+            "name": name.strip(),
+            "keywords": [str(k).strip() for k in keywords if str(k).strip()] or [""],
+            "isOwnBrand": is_own_brand,
+            "color": color
+        })
+
+    raw_settings = project.get("settings") or {}
+    if not isinstance(raw_settings, dict):
+        raise ValueError("'settings' must be a mapping.")
+    settings = {key: raw_settings[key] for key in SETTINGS_KEYS if key in raw_settings}
+    for key in ("dateFrom", "dateTo"):
+        if key in settings and not _MONTH_PATTERN.match(str(settings[key])):
+            raise ValueError(f"Setting '{key}' must use the YYYY-MM format.")
+    if settings.get("network", "GOOGLE_SEARCH") not in ("GOOGLE_SEARCH", "GOOGLE_SEARCH_AND_PARTNERS"):
+        raise ValueError(f"Unknown network '{settings['network']}'.")
+    if settings.get("granularity", "monthly") not in ("monthly", "quarterly", "yearly"):
+        raise ValueError(f"Unknown granularity '{settings['granularity']}'.")
+    fiscal_start_month = settings.get("fiscalStartMonth", 1)
+    if isinstance(fiscal_start_month, bool) or not isinstance(fiscal_start_month, int) or not 1 <= fiscal_start_month <= 12:
+        raise ValueError("Setting 'fiscalStartMonth' must be a month number from 1 to 12.")
+
+    return brands, settings
+
+
+def brands_to_rows(brands):
+    """Flatten brands into table rows for the bulk editor, joining keywords with commas."""
+    return [
+        {
+            "id": brand["id"],
+            "name": brand["name"],
+            "isOwnBrand": bool(brand["isOwnBrand"]),
+            "color": brand["color"],
+            "keywords": ", ".join(k for k in brand["keywords"] if k.strip())
+        }
+        for brand in brands
+    ]
+
+
+def rows_to_brands(rows):
+    """Turn bulk editor rows back into brands, giving new rows an ID and a default color."""
+    brands = []
+    role_counts = {True: 0, False: 0}
+    for row in rows:
+        name = row.get("name")
+        name = name.strip() if isinstance(name, str) else ""
+        keywords = row.get("keywords")
+        keywords = split_keywords(keywords if isinstance(keywords, str) else "", separator=",")
+        if not name and keywords == [""]:
+            continue
+        # Compare with == so numpy booleans count and empty (NaN) cells do not
+        is_own_brand = bool(row.get("isOwnBrand") == True)  # noqa: E712
+        color = row.get("color")
+        if not isinstance(color, str) or not _COLOR_PATTERN.match(color):
+            color = DEFAULT_BRAND_COLORS[role_counts[is_own_brand] % len(DEFAULT_BRAND_COLORS)]
+        role_counts[is_own_brand] += 1
+        brand_id = row.get("id")
+        brands.append({
+            "id": brand_id if isinstance(brand_id, str) and brand_id else str(uuid.uuid4()),
+            "name": name,
+            "keywords": keywords,
+            "isOwnBrand": is_own_brand,
+            "color": color
+        })
+    return brands
+
+
+def diff_projects(old_brands, old_settings, new_brands, new_settings):
+    """Compare two configurations and return one row per difference.
+
+    Brands are matched by name, case-insensitively.
+    """
+    rows = []
+
+    def add_row(section, item, field, before, after):
+        rows.append({"section": section, "item": item, "field": field, "before": before, "after": after})
+
+    for key in SETTINGS_KEYS:
+        before, after = old_settings.get(key), new_settings.get(key)
+        if before != after:
+            add_row("settings", key, "value", before, after)
+
+    old_by_name = {b["name"].strip().lower(): b for b in old_brands if b["name"].strip()}
+    new_by_name = {b["name"].strip().lower(): b for b in new_brands if b["name"].strip()}
+
+    for name_key, old_brand in old_by_name.items():
+        if name_key not in new_by_name:
+            add_row("brands", old_brand["name"], "brand", "present", "removed")
+    for name_key, new_brand in new_by_name.items():
+        old_brand = old_by_name.get(name_key)
+        if old_brand is None:
+            add_row("brands", new_brand["name"], "brand", "absent", "added")
+            continue
+        if old_brand["isOwnBrand"] != new_brand["isOwnBrand"]:
+            add_row("brands", new_brand["name"], "role",
+                    "own" if old_brand["isOwnBrand"] else "competitor",
+                    "own" if new_brand["isOwnBrand"] else "competitor")
+        if old_brand["color"].lower() != new_brand["color"].lower():
+            add_row("brands", new_brand["name"], "color", old_brand["color"], new_brand["color"])
+        old_keywords = {k.strip().lower() for k in old_brand["keywords"] if k.strip()}
+        new_keywords = {k.strip().lower() for k in new_brand["keywords"] if k.strip()}
+        removed = sorted(old_keywords - new_keywords)
+        added = sorted(new_keywords - old_keywords)
+        if removed or added:
+            add_row("brands", new_brand["name"], "keywords", ", ".join(removed), ", ".join(added))
+
+    return rows
@@ -0,0 +1,136 @@
+import csv
+import gzip
+import importlib.util
+import io
+import glob
+import os
+import tempfile
+import time
+
+# Rows written per CSV chunk or Parquet row group
+EXPORT_CHUNK_ROWS = 50_000
+
+# Export files older than this are removed, e.g. ones left behind when a process was killed mid-download
+EXPORT_MAX_AGE_SECONDS = 24 * 60 * 60
+
+_FILE_PREFIX = "share_of_search_"
+
+_EXTENSIONS = {"csv": ".csv", "parquet": ".parquet"}
+_COMPRESSED_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+_MIME_TYPES = {
+    ".csv": "text/csv",
+    ".gz": "application/gzip",
+    ".zst": "application/zstd",
+    ".parquet": "application/vnd.apache.parquet"
+}
+
+
+def available_formats():
+    """Return the export formats that can be written in this environment."""
+    formats = ["csv"]
+    if importlib.util.find_spec("pyarrow") is not None:
+        formats.append("parquet")
+    return formats
+
+
+def available_compressions(fmt):
+    """Return the compression options that can be used for a format in this environment."""
+    # Parquet has gzip and zstd codecs built in, zstd-compressed CSV needs the zstandard package
+    if fmt == "parquet" or importlib.util.find_spec("zstandard") is not None:
+        return ["none", "gzip", "zstd"]
+    return ["none", "gzip"]
+
+
+def export_file_name(base_name, fmt, compression):
+    """Return the download file name for a format and compression, e.g. data.csv.gz."""
+    name = base_name + _EXTENSIONS[fmt]
+    if fmt == "csv" and compression != "none":
+        name += _COMPRESSED_EXTENSIONS[compression]
+    return name
+
+
+def export_mime_type(file_name):
+    """Return the MIME type for an export file name."""
+    return _MIME_TYPES[os.path.splitext(file_name)[1]]
+
+
+def sweep_exports(directory=None, max_age=EXPORT_MAX_AGE_SECONDS):
+    """Delete export files in the directory that are older than max_age seconds and return how many were removed."""
+    cutoff = time.time() - max_age
+    removed = 0
+    for path in glob.glob(os.path.join(directory or tempfile.gettempdir(), _FILE_PREFIX + "*")):
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            # Another process removed or is still replacing the file
+            continue
+    return removed
+
+
+def write_export(records, fmt="csv", compression="none", chunk_rows=EXPORT_CHUNK_ROWS, directory=None):
+    """Write result records to a temporary file in chunks and return its path.
+
+    Rows are streamed to disk ``chunk_rows`` at a time, so the whole export never
+    exists as one string in memory. CSV files are compressed as a whole with gzip
+    or zstd, Parquet files compress each row group with the chosen codec. The
+    caller owns the returned file and should delete it when it is no longer needed.
+    Files left behind by interrupted exports are swept once they are older than
+    ``EXPORT_MAX_AGE_SECONDS``.
+    """
+    if fmt not in _EXTENSIONS:
+        raise ValueError(f"Unknown export format '{fmt}'.")
+    if compression not in ("none", "gzip", "zstd"):
+        raise ValueError(f"Unknown compression '{compression}'.")
+
+    sweep_exports(directory)
+    suffix = export_file_name("", fmt, compression)
+    handle, path = tempfile.mkstemp(prefix=_FILE_PREFIX, suffix=suffix, dir=directory)
+    os.close(handle)
+    try:
+        if fmt == "parquet":
+            _write_parquet(records, path, compression, chunk_rows)
+        else:
+            _write_csv(records, path, compression, chunk_rows)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+def read_export(records, fmt="csv", compression="none", chunk_rows=EXPORT_CHUNK_ROWS, directory=None):
+    """Write an export like write_export and return its bytes, removing the temporary file."""
+    path = write_export(records, fmt, compression, chunk_rows, directory)
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(path)
+
+
+def _write_csv(records, path, compression, chunk_rows):
+    fieldnames = list(records[0].keys()) if records else []
+    with open(path, "wb") as raw:
+        if compression == "gzip":
+            stream = gzip.GzipFile(fileobj=raw, mode="wb")
+        elif compression == "zstd":
+            import zstandard
+            stream = zstandard.ZstdCompressor().stream_writer(raw)
+        else:
+            stream = raw
+        with io.TextIOWrapper(stream, encoding="utf-8", newline="") as text:
+            writer = csv.DictWriter(text, fieldnames=fieldnames, extrasaction="ignore")
+            writer.writeheader()
+            for start in range(0, len(records), chunk_rows):
+                writer.writerows(records[start:start + chunk_rows])
+
+
+def _write_parquet(records, path, compression, chunk_rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.Table.from_pylist(records[:chunk_rows]).schema
+    with pq.ParquetWriter(path, schema, compression=compression) as writer:
+        for start in range(0, len(records), chunk_rows):
+            writer.write_table(pa.Table.from_pylist(records[start:start + chunk_rows], schema=schema))
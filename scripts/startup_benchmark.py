@@ -0,0 +1,127 @@
+"""Measure the import cost of app.py's top-level imports with ``python -X importtime``.
+
+Only the module-level import statements are executed, so no Streamlit script
+runs and no credentials are needed. Pass ``--baseline REV`` to compare against
+the same imports at another git revision, for example the commit before the
+imports were made lazy:
+
+    python scripts/startup_benchmark.py --baseline HEAD~1
+
+The script exits with status 1 when the current tree exceeds the budget.
+"""
+import argparse
+import ast
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+from io import BytesIO
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cold-start budget for app.py's top-level imports, in milliseconds
+IMPORT_BUDGET_MS = 700
+
+
+def top_level_imports(source):
+    """Return the module-level import statements of a Python source file as code."""
+    tree = ast.parse(source)
+    imports = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return "\n".join(ast.unparse(node) for node in imports)
+
+
+def measure_import_time(code, cwd):
+    """Run the imports in a fresh interpreter and return (total_ms, slowest top-level modules)."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd,
+        capture_output=True,
+        text=True
+    )
+    if completed.returncode != 0:
+        last_line = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else ""
+        raise RuntimeError(f"Imports failed: {last_line}")
+
+    total_us = 0
+    top_level = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        total_us += int(self_us)
+        # Top-level modules are not indented, their cumulative time includes all submodules
+        if not name[1:].startswith(" "):
+            top_level.append((int(cumulative_us), name.strip()))
+    top_level.sort(reverse=True)
+    return total_us / 1000, top_level
+
+
+def benchmark(code, cwd, runs):
+    """Return the median total import time over several runs and the slowest modules of the last run."""
+    totals = []
+    slowest = []
+    for _ in range(runs):
+        total_ms, slowest = measure_import_time(code, cwd)
+        totals.append(total_ms)
+    return statistics.median(totals), slowest
+
+
+def export_revision(revision, target_dir):
+    """Write the Python files of a git revision into target_dir."""
+    archive = subprocess.run(
+        ["git", "archive", "--format=tar", revision],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        check=True
+    ).stdout
+    with tarfile.open(fileobj=BytesIO(archive)) as tar:
+        members = [m for m in tar.getmembers() if m.name.endswith(".py") and "/" not in m.name]
+        tar.extractall(target_dir, members=members, filter="data")
+
+
+def report(label, total_ms, slowest, top):
+    print(f"{label}: {total_ms:.1f} ms")
+    for cumulative_us, name in slowest[:top]:
+        print(f"    {cumulative_us / 1000:8.1f} ms  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline", help="git revision to compare against, e.g. HEAD~1")
+    parser.add_argument("--runs", type=int, default=5, help="runs per measurement, the median is reported")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS, help="fail when the current tree is slower")
+    parser.add_argument("--top", type=int, default=8, help="number of slowest top-level modules to list")
+    args = parser.parse_args()
+
+    try:
+        run(args)
+    except RuntimeError as e:
+        sys.exit(str(e))
+
+
+def run(args):
+    if args.baseline:
+        with tempfile.TemporaryDirectory() as baseline_dir:
+            export_revision(args.baseline, baseline_dir)
+            with open(os.path.join(baseline_dir, "app.py"), encoding="utf-8") as f:
+                baseline_code = top_level_imports(f.read())
+            baseline_ms, baseline_slowest = benchmark(baseline_code, baseline_dir, args.runs)
+        report(f"Baseline ({args.baseline})", baseline_ms, baseline_slowest, args.top)
+
+    with open(os.path.join(REPO_ROOT, "app.py"), encoding="utf-8") as f:
+        current_code = top_level_imports(f.read())
+    current_ms, current_slowest = benchmark(current_code, REPO_ROOT, args.runs)
+    report("Current", current_ms, current_slowest, args.top)
+
+    if args.baseline:
+        print(f"Change: {current_ms - baseline_ms:+.1f} ms")
+
+    if current_ms > args.budget_ms:
+        print(f"Import time {current_ms:.1f} ms exceeds the budget of {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def make_cache_key(payload):
+    """Return a stable digest for a JSON-serializable request description."""
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class _Flight:
+    """A fetch in progress that other sessions can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SharedResultCache:
+    """Process-wide result cache shared by every Streamlit session.
+
+    Entries live in an in-memory LRU and, when ``db_path`` is given, in a local
+    SQLite file so they survive restarts. Identical fetches that are already in
+    flight are not repeated: later callers wait for the first one to finish.
+    Every entry is scoped to a Google Ads customer ID, so a lookup for one
+    account can never return another account's data. Cached values are shared
+    between sessions and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries=512, ttl_seconds=12 * 60 * 60, db_path=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " customer_id TEXT NOT NULL,"
+                " cache_key TEXT NOT NULL,"
+                " stored_at REAL NOT NULL,"
+                " value TEXT NOT NULL,"
+                " PRIMARY KEY (customer_id, cache_key))"
+            )
+            self._db.commit()
+
+    def get_or_fetch(self, customer_id, cache_key, fetch):
+        """Return the cached value for the key, calling ``fetch()`` at most once across sessions."""
+        if not customer_id:
+            raise ValueError("A customer ID is required to use the shared cache.")
+        scoped_key = (str(customer_id), cache_key)
+
+        with self._lock:
+            value = self._lookup(scoped_key)
+            if value is not None:
+                return value
+            flight = self._in_flight.get(scoped_key)
+            is_leader = flight is None
+            if is_leader:
+                flight = _Flight()
+                self._in_flight[scoped_key] = flight
+
+        if not is_leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = fetch()
+        except BaseException as e:
+            flight.error = e
+            raise
+        else:
+            with self._lock:
+                self._store(scoped_key, flight.value)
+            return flight.value
+        finally:
+            with self._lock:
+                self._in_flight.pop(scoped_key, None)
+            flight.done.set()
+
+    def clear(self, customer_id=None):
+        """Drop cached entries, either for one customer ID or for all of them."""
+        with self._lock:
+            if customer_id is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == str(customer_id)]:
+                    del self._entries[key]
+            if self._db is not None:
+                if customer_id is None:
+                    self._db.execute("DELETE FROM results")
+                else:
+                    self._db.execute("DELETE FROM results WHERE customer_id = ?", (str(customer_id),))
+                self._db.commit()
+
+    def _is_fresh(self, stored_at):
+        return self.ttl_seconds is None or time.time() - stored_at < self.ttl_seconds
+
+    def _lookup(self, scoped_key):
+        # Callers must hold self._lock
+        entry = self._entries.get(scoped_key)
+        if entry is not None:
+            stored_at, value = entry
+            if self._is_fresh(stored_at):
+                self._entries.move_to_end(scoped_key)
+                return value
+            del self._entries[scoped_key]
+
+        if self._db is not None:
+            row = self._db.execute(
+                "SELECT stored_at, value FROM results WHERE customer_id = ? AND cache_key = ?",
+                scoped_key
+            ).fetchone()
+            if row is not None:
+                stored_at, raw_value = row
+                if self._is_fresh(stored_at):
+                    value = json.loads(raw_value)
+                    self._remember(scoped_key, stored_at, value)
+                    return value
+                self._db.execute(
+                    "DELETE FROM results WHERE customer_id = ? AND cache_key = ?", scoped_key
+                )
+                self._db.commit()
+        return None
+
+    def _store(self, scoped_key, value):
+        # Callers must hold self._lock
+        stored_at = time.time()
+        self._remember(scoped_key, stored_at, value)
+        if self._db is not None:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (customer_id, cache_key, stored_at, value) VALUES (?, ?, ?, ?)",
+                (scoped_key[0], scoped_key[1], stored_at, json.dumps(value))
+            )
+            self._db.commit()
+
+    def _remember(self, scoped_key, stored_at, value):
+        self._entries[scoped_key] = (stored_at, value)
+        self._entries.move_to_end(scoped_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
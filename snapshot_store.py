@@ -0,0 +1,173 @@
+import sqlite3
+import threading
+from datetime import date, datetime
+
+
+def _month_index(year, month):
+    return year * 12 + month - 1
+
+
+def _month_label(index):
+    return f"{index // 12}-{index % 12 + 1:02d}"
+
+
+def _day(value):
+    """Convert a date, datetime or ISO string into a day ordinal."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.toordinal()
+
+
+class SnapshotStore:
+    """Append-only history of fetched monthly search volumes.
+
+    Every fetch is stamped with the day it was made. A value is only written
+    when it differs from the latest earlier value for the same keyword, location,
+    network and month, so storage grows with Google's revisions rather than with
+    the number of fetches. Keywords are interned and months and days are stored as
+    integers in a WITHOUT ROWID table whose primary key serves the
+    (keyword, location, month, as-of date) lookups. The days of all fetches are
+    kept in a separate table, so a fetch without revisions is still a snapshot.
+    History is kept per Google Ads customer ID, like the shared result cache.
+    """
+
+    def __init__(self, db_path):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS keywords ("
+            " id INTEGER PRIMARY KEY,"
+            " text TEXT NOT NULL UNIQUE);"
+            "CREATE TABLE IF NOT EXISTS volumes ("
+            " customer_id TEXT NOT NULL,"
+            " keyword_id INTEGER NOT NULL,"
+            " location TEXT NOT NULL,"
+            " network TEXT NOT NULL,"
+            " month INTEGER NOT NULL,"
+            " fetched_on INTEGER NOT NULL,"
+            " searches INTEGER NOT NULL,"
+            " PRIMARY KEY (customer_id, keyword_id, location, network, month, fetched_on)"
+            ") WITHOUT ROWID;"
+            "CREATE TABLE IF NOT EXISTS snapshots ("
+            " customer_id TEXT NOT NULL,"
+            " location TEXT NOT NULL,"
+            " network TEXT NOT NULL,"
+            " fetched_on INTEGER NOT NULL,"
+            " PRIMARY KEY (customer_id, location, network, fetched_on)"
+            ") WITHOUT ROWID;"
+            # Stores created before fetches had their own table only know the days with revised values
+            "INSERT OR IGNORE INTO snapshots (customer_id, location, network, fetched_on)"
+            " SELECT DISTINCT customer_id, location, network, fetched_on FROM volumes"
+            " WHERE NOT EXISTS (SELECT 1 FROM snapshots);"
+            "DROP INDEX IF EXISTS volumes_by_fetch;"
+        )
+        self._db.commit()
+
+    def record(self, customer_id, location, network, fetched_at, ideas):
+        """Store the monthly volumes of fetched keyword ideas and return how many values were new or revised."""
+        fetched_on = _day(fetched_at)
+        stored = 0
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR IGNORE INTO snapshots (customer_id, location, network, fetched_on) VALUES (?, ?, ?, ?)",
+                (str(customer_id), location, network, fetched_on)
+            )
+            for idea in ideas:
+                keyword_id = self._keyword_id(idea["text"].lower())
+                for year, month, searches in idea["monthly_search_volumes"]:
+                    row_key = (str(customer_id), keyword_id, location, network, _month_index(year, month))
+                    previous = self._db.execute(
+                        "SELECT searches FROM volumes"
+                        " WHERE customer_id = ? AND keyword_id = ? AND location = ? AND network = ? AND month = ?"
+                        " AND fetched_on < ? ORDER BY fetched_on DESC LIMIT 1",
+                        row_key + (fetched_on,)
+                    ).fetchone()
+                    if previous is not None and previous[0] == (searches or 0):
+                        # Unchanged, drop a same-day value that an earlier fetch today may have written
+                        self._db.execute(
+                            "DELETE FROM volumes WHERE customer_id = ? AND keyword_id = ? AND location = ?"
+                            " AND network = ? AND month = ? AND fetched_on = ?",
+                            row_key + (fetched_on,)
+                        )
+                        continue
+                    cursor = self._db.execute(
+                        "INSERT OR REPLACE INTO volumes"
+                        " (customer_id, keyword_id, location, network, month, fetched_on, searches)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        row_key + (fetched_on, searches or 0)
+                    )
+                    stored += cursor.rowcount
+        return stored
+
+    def value_as_of(self, customer_id, keyword, location, network, year, month, as_of):
+        """Return the search volume that was known for a keyword and month on a given date, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT v.searches FROM volumes v JOIN keywords k ON k.id = v.keyword_id"
+                " WHERE v.customer_id = ? AND k.text = ? AND v.location = ? AND v.network = ? AND v.month = ?"
+                " AND v.fetched_on <= ? ORDER BY v.fetched_on DESC LIMIT 1",
+                (str(customer_id), keyword.lower(), location, network, _month_index(year, month), _day(as_of))
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def snapshot_dates(self, customer_id, location, network):
+        """Return the days on which volumes were fetched, oldest first, including fetches that revised nothing."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT fetched_on FROM snapshots WHERE customer_id = ? AND location = ? AND network = ?"
+                " ORDER BY fetched_on",
+                (str(customer_id), location, network)
+            ).fetchall()
+        return [date.fromordinal(row[0]) for row in rows]
+
+    def compare(self, customer_id, location, network, keywords, before, after):
+        """Return the monthly values of the keywords that differ between two as-of dates.
+
+        Each row has keyword, month ("YYYY-MM"), before, after and change; a value
+        missing on one side is None.
+        """
+        keywords = sorted({k.strip().lower() for k in keywords if k.strip()})
+        if not keywords:
+            return []
+        params = {"customer_id": str(customer_id), "location": location, "network": network,
+                  "before": _day(before), "after": _day(after)}
+        params.update({f"keyword_{i}": keyword for i, keyword in enumerate(keywords)})
+        placeholders = ", ".join(f":keyword_{i}" for i in range(len(keywords)))
+        # Each side is a primary key seek per keyword and month, so history length barely matters
+        latest_as_of = (
+            "(SELECT searches FROM volumes"
+            " WHERE customer_id = :customer_id AND keyword_id = series.keyword_id AND location = :location"
+            " AND network = :network AND month = series.month AND fetched_on <= :{as_of}"
+            " ORDER BY fetched_on DESC LIMIT 1)"
+        )
+        with self._lock:
+            rows = self._db.execute(
+                "WITH series AS ("
+                " SELECT DISTINCT keyword_id, month FROM volumes"
+                " WHERE customer_id = :customer_id AND location = :location AND network = :network"
+                f" AND keyword_id IN (SELECT id FROM keywords WHERE text IN ({placeholders}))"
+                "), pairs AS ("
+                f" SELECT keyword_id, month, {latest_as_of.format(as_of='before')} AS before,"
+                f" {latest_as_of.format(as_of='after')} AS after FROM series"
+                ")"
+                " SELECT k.text, p.month, p.before, p.after FROM pairs p JOIN keywords k ON k.id = p.keyword_id"
+                " WHERE p.before IS NOT p.after ORDER BY k.text, p.month",
+                params
+            ).fetchall()
+        return [
+            {
+                "keyword": text,
+                "month": _month_label(month),
+                "before": before_value,
+                "after": after_value,
+                "change": None if before_value is None or after_value is None else after_value - before_value
+            }
+            for text, month, before_value, after_value in rows
+        ]
+
+    def _keyword_id(self, text):
+        # Callers must hold self._lock
+        self._db.execute("INSERT OR IGNORE INTO keywords (text) VALUES (?)", (text,))
+        return self._db.execute("SELECT id FROM keywords WHERE text = ?", (text,)).fetchone()[0]
@@ -0,0 +1,98 @@
+from keyword_discovery import discover_keywords
+
+BRANDS = [
+    {"name": "BMW", "keywords": ["bmw"], "isOwnBrand": True},
+    {"name": "Audi", "keywords": ["audi"], "isOwnBrand": False},
+]
+
+
+def idea(text, source_brand, searches):
+    return {
+        "text": text,
+        "source_brand": source_brand,
+        "monthly_search_volumes": [[2024, month, searches] for month in range(1, 13)],
+    }
+
+
+def test_generic_queries_do_not_become_candidate_brands():
+    ideas = []
+    for source in ("BMW", "Audi"):
+        ideas += [
+            idea("used cars near me", source, 9000),
+            idea("cheap cars for sale", source, 7000),
+            idea("cars for sale near me", source, 8000),
+        ]
+    ideas += [
+        idea("bmw cars", "BMW", 500),
+        idea("audi cars for sale", "Audi", 400),
+        idea("mercedes c class", "BMW", 300),
+        idea("mercedes gle", "Audi", 200),
+    ]
+
+    keyword_suggestions, brand_suggestions = discover_keywords(ideas, BRANDS, "2024-01", "2024-12")
+
+    assert set(keyword_suggestions["keyword"]) == {"bmw cars", "audi cars for sale"}
+    assert list(brand_suggestions["candidate_brand"]) == ["Mercedes"]
+
+
+def test_competitor_returned_for_every_seed_is_a_candidate():
+    ideas = [
+        idea(text, source, 300)
+        for source in ("BMW", "Audi")
+        for text in ("mercedes c class", "mercedes gle", "bmw x5", "audi a4")
+    ]
+
+    _, brand_suggestions = discover_keywords(ideas, BRANDS, "2024-01", "2024-12")
+
+    assert list(brand_suggestions["candidate_brand"]) == ["Mercedes"]
+
+
+def test_brand_keyword_matches_only_as_a_whole():
+    brands = [
+        {"name": "Skoda", "keywords": ["skoda auto", "octavia"], "isOwnBrand": True},
+        {"name": "Audi", "keywords": ["audi"], "isOwnBrand": False},
+    ]
+    ideas = [
+        idea("skoda auto price", "Skoda", 500),
+        idea("octavia combi", "Skoda", 400),
+        idea("hyundai auto", "Skoda", 300),
+        idea("hyundai i30", "Skoda", 200),
+    ]
+
+    keyword_suggestions, brand_suggestions = discover_keywords(ideas, brands, "2024-01", "2024-12")
+
+    assert dict(zip(keyword_suggestions["keyword"], keyword_suggestions["brand"])) == {
+        "skoda auto price": "Skoda",
+        "octavia combi": "Skoda",
+    }
+    assert list(brand_suggestions["candidate_brand"]) == ["Hyundai"]
+
+
+def test_stopwords_in_brand_keywords_match_nothing():
+    brands = [{"name": "Tesla", "keywords": ["tesla for sale"], "isOwnBrand": True}]
+    ideas = [idea("rivian for sale", "Tesla", 100), idea("rivian r1s", "Tesla", 100)]
+
+    keyword_suggestions, brand_suggestions = discover_keywords(ideas, brands, "2024-01", "2024-12")
+
+    assert keyword_suggestions.empty
+    assert list(brand_suggestions["candidate_brand"]) == ["Rivian"]
+
+
+def test_filler_words_never_win_a_cluster():
+    ideas = [
+        idea("tesla for sale", "BMW", 100),
+        idea("tesla model 3 near me", "BMW", 100),
+        idea("rivian for sale near me", "BMW", 100),
+    ]
+
+    _, brand_suggestions = discover_keywords(ideas, BRANDS, "2024-01", "2024-12")
+
+    assert list(brand_suggestions["candidate_brand"]) == ["Tesla"]
+
+
+def test_known_keywords_are_not_suggested():
+    ideas = [idea("bmw", "BMW", 1000), idea("bmw dealer", "BMW", 100)]
+
+    keyword_suggestions, _ = discover_keywords(ideas, BRANDS, "2024-01", "2024-12")
+
+    assert list(keyword_suggestions["keyword"]) == ["bmw dealer"]
@@ -0,0 +1,109 @@
+import random
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from period_calendar import GRANULARITIES, add_months, build_calendar, period_table
+
+# Seeded random ranges, so failures are reproducible
+RANGES = []
+_rng = random.Random(2024)
+for _ in range(150):
+    _start = (_rng.randint(2015, 2026), _rng.randint(1, 12))
+    _end = add_months(*_start, _rng.randint(0, 40))
+    RANGES.append((f"{_start[0]}-{_start[1]:02d}", f"{_end[0]}-{_end[1]:02d}", _rng.randint(1, 12)))
+
+
+def months_between(date_from, date_to):
+    year, month = map(int, date_from.split("-"))
+    end = tuple(map(int, date_to.split("-")))
+    months = []
+    while (year, month) <= end:
+        months.append((year, month))
+        year, month = add_months(year, month, 1)
+    return months
+
+
+@pytest.mark.parametrize("date_from,date_to,fiscal_start_month", RANGES)
+@pytest.mark.parametrize("granularity", GRANULARITIES)
+def test_every_month_maps_to_exactly_one_period(date_from, date_to, fiscal_start_month, granularity):
+    table = period_table(date_from, date_to, granularity, fiscal_start_month)
+    assert list(zip(table["year"], table["month"])) == months_between(date_from, date_to)
+    assert table["period"].notna().all()
+    # A period covers consecutive months only
+    changes = (table["period"] != table["period"].shift()).sum()
+    assert changes == table["period"].nunique()
+
+
+@pytest.mark.parametrize("date_from,date_to,fiscal_start_month", RANGES)
+@pytest.mark.parametrize("granularity", GRANULARITIES)
+def test_period_bounds_are_clipped_to_the_range(date_from, date_to, fiscal_start_month, granularity):
+    table = period_table(date_from, date_to, granularity, fiscal_start_month)
+    calendar_months = pd.DataFrame(build_calendar(date_from, date_to, fiscal_start_month))
+    range_start = date.fromisoformat(f"{date_from}-01").isoformat()
+    range_end = calendar_months["month_end"].iloc[-1]
+
+    assert (table["period_start"] >= range_start).all()
+    assert (table["period_end"] <= range_end).all()
+    assert table["period_start"].iloc[0] == range_start
+    assert table["period_end"].iloc[-1] == range_end
+
+    for _, months in table.assign(month_start=calendar_months["month_start"],
+                                  month_end=calendar_months["month_end"]).groupby("period"):
+        assert (months["period_start"] == months["month_start"].min()).all()
+        assert (months["period_end"] == months["month_end"].max()).all()
+
+
+@pytest.mark.parametrize("fiscal_start_month", range(2, 13))
+@pytest.mark.parametrize("year", [2019, 2024, 2025])
+def test_fiscal_year_is_named_after_the_year_it_ends_in(fiscal_start_month, year):
+    end = add_months(year, fiscal_start_month, 11)
+    rows = build_calendar(f"{year}-{fiscal_start_month:02d}", f"{end[0]}-{end[1]:02d}", fiscal_start_month)
+
+    assert len(rows) == 12
+    assert {row.year_label for row in rows} == {f"FY{end[0]}"}
+    assert [row.quarter_label for row in rows] == [f"FY{end[0]}-Q{q}" for q in (1, 2, 3, 4) for _ in range(3)]
+    # The month before the fiscal start belongs to the previous fiscal year
+    before = add_months(year, fiscal_start_month, -1)
+    previous = build_calendar(f"{before[0]}-{before[1]:02d}", f"{before[0]}-{before[1]:02d}", fiscal_start_month)
+    assert previous[0].quarter_label == f"FY{end[0] - 1}-Q4"
+
+
+def test_calendar_years_keep_plain_labels():
+    rows = build_calendar("2024-01", "2024-12")
+    assert {row.year_label for row in rows} == {"2024"}
+    assert [row.quarter_label for row in rows[::3]] == ["2024-Q1", "2024-Q2", "2024-Q3", "2024-Q4"]
+
+
+@pytest.mark.parametrize("date_from,date_to,fiscal_start_month", RANGES[:50])
+def test_joined_totals_match_direct_sums(date_from, date_to, fiscal_start_month):
+    rng = random.Random(f"{date_from}{date_to}")
+    months = months_between(date_from, date_to)
+    # Volumes include a month on each side of the range, like the API's extra month
+    fetched = [add_months(*months[0], -1)] + months + [add_months(*months[-1], 1)]
+    volumes = pd.DataFrame(
+        [(year, month, rng.randint(0, 10_000)) for year, month in fetched], columns=["year", "month", "volume"]
+    )
+    in_range = volumes.iloc[1:-1]
+
+    direct_keys = {
+        "monthly": lambda y, m: f"{y}-{m:02d}",
+        "quarterly": lambda y, m: f"{y}-Q{(m - 1) // 3 + 1}",
+        "yearly": lambda y, m: str(y),
+    }
+    for granularity in GRANULARITIES:
+        joined = (
+            volumes.merge(period_table(date_from, date_to, granularity), on=["year", "month"])
+            .groupby("period")["volume"].sum().to_dict()
+        )
+        expected = {}
+        for year, month, volume in in_range.itertuples(index=False):
+            key = direct_keys[granularity](year, month)
+            expected[key] = expected.get(key, 0) + volume
+        assert joined == expected
+
+    # Fiscal periods regroup the same months, so the overall total is unchanged
+    for granularity in ("quarterly", "yearly"):
+        fiscal = volumes.merge(period_table(date_from, date_to, granularity, fiscal_start_month), on=["year", "month"])
+        assert fiscal["volume"].sum() == in_range["volume"].sum()
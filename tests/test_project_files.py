@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from project_files import export_project, parse_project
+
+SETTINGS = {"location": "Germany", "network": "GOOGLE_SEARCH", "dateFrom": "2024-01", "dateTo": "2024-12",
+            "granularity": "quarterly", "fiscalStartMonth": 4}
+
+
+def project(**brand):
+    return json.dumps({"version": 1, "brands": [{"name": "BMW", "keywords": ["bmw"], **brand}], "settings": SETTINGS})
+
+
+def test_round_trip():
+    brands = [{"id": "x", "name": "BMW", "keywords": ["bmw", "bmw x5", ""], "isOwnBrand": True, "color": "#112233"}]
+
+    parsed_brands, parsed_settings = parse_project(export_project(brands, SETTINGS))
+
+    assert [{k: v for k, v in b.items() if k != "id"} for b in parsed_brands] == [
+        {"name": "BMW", "keywords": ["bmw", "bmw x5"], "isOwnBrand": True, "color": "#112233"}
+    ]
+    assert parsed_settings == SETTINGS
+
+
+def test_missing_is_own_brand_means_competitor():
+    brands, _ = parse_project(project())
+
+    assert brands[0]["isOwnBrand"] is False
+
+
+@pytest.mark.parametrize("brand", [
+    {"isOwnBrand": "false"},
+    {"isOwnBrand": 1},
+    {"isOwnBrand": None},
+    {"name": 42},
+    {"keywords": {"bmw": 1}},
+    {"keywords": [["bmw"]]},
+])
+def test_malformed_brand_fields_are_rejected(brand):
+    with pytest.raises(ValueError):
+        parse_project(project(**brand))
+
+
+@pytest.mark.parametrize("settings", [{"fiscalStartMonth": True}, {"fiscalStartMonth": 13}, {"dateFrom": "2024-13"}])
+def test_malformed_settings_are_rejected(settings):
+    text = json.dumps({"brands": [], "settings": {**SETTINGS, **settings}})
+
+    with pytest.raises(ValueError):
+        parse_project(text)
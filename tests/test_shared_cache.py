@@ -0,0 +1,150 @@
+import threading
+
+import pytest
+
+import shared_cache
+from shared_cache import SharedResultCache, make_cache_key
+
+THREADS = 20
+
+
+class Fetch:
+    """A fetch that counts its calls and blocks until released."""
+
+    def __init__(self, value=None, error=None):
+        self.value = value
+        self.error = error
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class CountingEvent(threading.Event):
+    """An event that signals a semaphore whenever a thread starts waiting on it."""
+
+    def __init__(self):
+        super().__init__()
+        self.waiting = threading.Semaphore(0)
+
+    def wait(self, timeout=None):
+        self.waiting.release()
+        return super().wait(timeout)
+
+
+def run_concurrently(cache, fetch, customer_id="1", cache_key="key"):
+    """Call get_or_fetch from THREADS threads while the first fetch is in flight, return values and errors."""
+    values, errors = [], []
+
+    def call():
+        try:
+            values.append(cache.get_or_fetch(customer_id, cache_key, fetch))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(THREADS)]
+    threads[0].start()
+    assert fetch.started.wait(5)
+    flight = cache._in_flight[(customer_id, cache_key)]
+    flight.done = CountingEvent()
+    for thread in threads[1:]:
+        thread.start()
+    # Release the leader only once every other thread waits on its flight
+    for _ in threads[1:]:
+        assert flight.done.waiting.acquire(timeout=5)
+    fetch.release.set()
+    for thread in threads:
+        thread.join(5)
+    return values, errors
+
+
+def test_concurrent_identical_fetches_run_once():
+    cache = SharedResultCache()
+    fetch = Fetch(value={"ideas": [1, 2, 3]})
+
+    values, errors = run_concurrently(cache, fetch)
+
+    assert fetch.calls == 1
+    assert errors == []
+    assert len(values) == THREADS
+    assert all(value is values[0] for value in values)
+    assert cache.get_or_fetch("1", "key", Fetch(value="other")) is values[0]
+
+
+def test_leader_error_reaches_waiters_and_clears_the_flight():
+    cache = SharedResultCache()
+    error = RuntimeError("quota exceeded")
+    fetch = Fetch(error=error)
+
+    values, errors = run_concurrently(cache, fetch)
+
+    assert fetch.calls == 1
+    assert values == []
+    assert len(errors) == THREADS
+    assert all(e is error for e in errors)
+    assert cache._in_flight == {}
+
+    # Nothing was cached, so the next call fetches again
+    retry = Fetch(value="ok")
+    retry.release.set()
+    assert cache.get_or_fetch("1", "key", retry) == "ok"
+    assert retry.calls == 1
+
+
+def test_customer_ids_never_share_entries(tmp_path):
+    db_path = str(tmp_path / "cache.sqlite")
+    cache = SharedResultCache(db_path=db_path)
+    cache.get_or_fetch("1", "key", lambda: "account one")
+
+    assert cache.get_or_fetch("2", "key", lambda: "account two") == "account two"
+    assert cache.get_or_fetch("1", "key", lambda: pytest.fail("cached value expected")) == "account one"
+
+    # A fresh process only has the SQLite backing, which is scoped the same way
+    restarted = SharedResultCache(db_path=db_path)
+    assert restarted.get_or_fetch("2", "key", lambda: pytest.fail("cached value expected")) == "account two"
+    assert restarted.get_or_fetch("3", "key", lambda: "account three") == "account three"
+
+    restarted.clear("1")
+    assert restarted.get_or_fetch("1", "key", lambda: "refetched") == "refetched"
+    assert restarted.get_or_fetch("2", "key", lambda: pytest.fail("cached value expected")) == "account two"
+
+
+def test_customer_id_is_required():
+    with pytest.raises(ValueError):
+        SharedResultCache().get_or_fetch("", "key", lambda: "value")
+
+
+@pytest.mark.parametrize("use_db", [False, True])
+def test_entries_expire_after_the_ttl(tmp_path, monkeypatch, use_db):
+    now = [1_000_000.0]
+    monkeypatch.setattr(shared_cache.time, "time", lambda: now[0])
+    cache = SharedResultCache(ttl_seconds=60, db_path=str(tmp_path / "cache.sqlite") if use_db else None)
+    cache.get_or_fetch("1", "key", lambda: "first")
+
+    now[0] += 59
+    assert cache.get_or_fetch("1", "key", lambda: "second") == "first"
+    now[0] += 2
+    assert cache.get_or_fetch("1", "key", lambda: "second") == "second"
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SharedResultCache(max_entries=2)
+    cache.get_or_fetch("1", "a", lambda: "a")
+    cache.get_or_fetch("1", "b", lambda: "b")
+    cache.get_or_fetch("1", "a", lambda: pytest.fail("cached value expected"))
+    cache.get_or_fetch("1", "c", lambda: "c")
+
+    assert cache.get_or_fetch("1", "a", lambda: "a again") == "a"
+    assert cache.get_or_fetch("1", "b", lambda: "b again") == "b again"
+
+
+def test_cache_key_ignores_key_order():
+    assert make_cache_key({"a": 1, "b": [1, 2]}) == make_cache_key({"b": [1, 2], "a": 1})
+    assert make_cache_key({"a": 1}) != make_cache_key({"a": 2})
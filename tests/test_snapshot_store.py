@@ -0,0 +1,41 @@
+from datetime import date
+
+from snapshot_store import SnapshotStore
+
+MARKET = ("2840", "GOOGLE_SEARCH")
+
+
+def ideas(searches):
+    return [{"text": "BMW", "monthly_search_volumes": [[2024, 1, searches], [2024, 2, 50]]}]
+
+
+def test_fetch_without_revisions_is_still_a_snapshot(tmp_path):
+    store = SnapshotStore(str(tmp_path / "history.sqlite"))
+    store.record("1", *MARKET, "2024-03-01", ideas(100))
+
+    assert store.record("1", *MARKET, "2024-04-01T09:30:00", ideas(100)) == 0
+    assert store.snapshot_dates("1", *MARKET) == [date(2024, 3, 1), date(2024, 4, 1)]
+    assert store.compare("1", *MARKET, ["bmw"], "2024-03-01", "2024-04-01") == []
+
+
+def test_revisions_between_snapshots(tmp_path):
+    store = SnapshotStore(str(tmp_path / "history.sqlite"))
+    store.record("1", *MARKET, "2024-03-01", ideas(100))
+    store.record("1", *MARKET, "2024-04-01", ideas(100))
+    store.record("1", *MARKET, "2024-05-01", ideas(120))
+
+    assert store.value_as_of("1", "bmw", *MARKET, 2024, 1, "2024-04-15") == 100
+    assert store.value_as_of("1", "bmw", *MARKET, 2024, 1, "2024-05-01") == 120
+    assert store.compare("1", *MARKET, ["bmw"], "2024-04-01", "2024-05-01") == [
+        {"keyword": "bmw", "month": "2024-01", "before": 100, "after": 120, "change": 20}
+    ]
+
+
+def test_history_is_scoped_per_customer_and_market(tmp_path):
+    store = SnapshotStore(str(tmp_path / "history.sqlite"))
+    store.record("1", *MARKET, "2024-03-01", ideas(100))
+    store.record("2", *MARKET, "2024-04-01", ideas(200))
+
+    assert store.snapshot_dates("1", *MARKET) == [date(2024, 3, 1)]
+    assert store.snapshot_dates("1", "2276", "GOOGLE_SEARCH") == []
+    assert store.value_as_of("1", "bmw", *MARKET, 2024, 1, "2024-04-01") == 100